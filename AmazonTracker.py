@@ -1,6 +1,11 @@
 import logging
 import re
-import statistics
+import sys
+import html
+import hashlib
+import importlib.util
+import random
+from urllib.parse import urlparse
 import webbrowser
 import pandas as pd
 import plotly.graph_objects as go
@@ -15,16 +20,27 @@ import tkinter as tk
 from tkinter import ttk, messagebox, simpledialog
 import pyperclip
 import requests
+from requests.adapters import HTTPAdapter
 from bs4 import BeautifulSoup
 import smtplib
 from email.mime.multipart import MIMEMultipart
 from email.mime.text import MIMEText
 from email.mime.image import MIMEImage
 import datetime
+import math
+from array import array
+from collections.abc import Sequence
 import time
 import threading
+import heapq
+import bisect
+import itertools
+from concurrent.futures import ThreadPoolExecutor
 import json
+import queue
+import sqlite3
 import os
+import shutil
 import ctypes
 
 ctypes.windll.shcore.SetProcessDpiAwareness(2)  # Abilita il supporto per il DPI per-monitor su Windows 8.1 o superiore
@@ -41,31 +57,35 @@ logger.addHandler(logger_handler)
 def load_products():
     """
     Carica i dati dei prodotti da file e avvia il monitoraggio per ogni prodotto
+    Va chiamata dopo `load_prices`, che carica le statistiche usate per l'intervallo adattivo
     """
     global products, products_to_view
 
-    if os.path.exists(products_file):
+    if storage_backend == "sqlite" or snapshot_exists(products_file):
         try:
-            with open(products_file, "r") as file:
-                products = json.load(file)
+            if storage_backend == "sqlite":
+                with database_lock:
+                    products = {name: json.loads(data) for name, data in get_database().execute("SELECT name, data FROM products ORDER BY id")}
 
-                # Controllo validità dei dati estratti
-                for name in products:
-                    if not isinstance(products[name], dict):
-                        raise Exception("Ogni elemento nel file JSON dei dati prodotti deve essere un dizionario")
-                    
-                    url = products[name].get("url")
+                validate_products_data(products)
+            else:
+                products, products_path = load_json_snapshot(products_file, validate_products_data)
 
-                    if not url:
-                        raise Exception("Ogni prodotto deve avere un 'url'")
-                    
-                    # Avvio monitoraggio del prodotto estratto
-                    start_tracking(name, url)
+                # Il file principale danneggiato viene riscritto con i dati recuperati dalla copia di sicurezza
+                if products_path != products_file:
+                    mark_dirty("products")
+
+            for name in products:
+                # Avvio monitoraggio del prodotto estratto
+                start_tracking(name, products[name]["url"])
 
-                # Aggiornamento prodotti da visualizzare sulla TreeView
-                products_to_view = products
+            # Aggiornamento prodotti da visualizzare sulla TreeView
+            products_to_view = products
+
+            # Indici ordinati per colonna usati da ordinamenti e filtri
+            build_sort_indexes()
 
-                logger.info("Dati dei prodotti caricati correttamente")
+            logger.info("Dati dei prodotti caricati correttamente")
         except Exception as e:
             logger.error(f"Errore durante il caricamento dei dati prodotti: {e}")
             messagebox.showerror("Attenzione", "Errore durante il caricamento dei dati prodotti")
@@ -84,24 +104,59 @@ def load_products():
             exit()
 
 
+def validate_products_data(data):
+    """
+    Controlla la validità dei dati dei prodotti letti da file
+    """
+    if not isinstance(data, dict):
+        raise Exception("Il file JSON dei dati prodotti deve contenere un dizionario")
+    
+    for name in data:
+        if not isinstance(data[name], dict):
+            raise Exception("Ogni elemento nel file JSON dei dati prodotti deve essere un dizionario")
+
+        if not data[name].get("url"):
+            raise Exception("Ogni prodotto deve avere un 'url'")
+
+
 def save_products():
     """
-    Salva i dati dei prodotti su file
+    Segna i dati dei prodotti come da salvare: il salvataggio avviene in background, raggruppando le modifiche ravvicinate
     """
     global products_to_view
 
     # Aggiornamento prodotti da visualizzare sulla TreeView
     products_to_view = products
 
+    mark_dirty("products")
+
+
+def write_products():
+    """
+    Salva i dati dei prodotti su file
+    """
     try:
-        # Salvataggio su file
-        with open(products_file, "w") as file:
-            json.dump(products, file, indent=4)
+        # Copia dei dati presa con il lock dei thread di monitoraggio, che aggiornano i prodotti
+        with check_price_lock:
+            products_data = json.dumps(products, indent=4) if storage_backend != "sqlite" else [(name, json.dumps(product)) for name, product in products.items()]
+
+        if storage_backend == "sqlite":
+            # Salvataggio nel database in un'unica transazione
+            with database_lock, get_database() as database:
+                database.execute("DELETE FROM products")
+                database.executemany("INSERT INTO products (name, data) VALUES (?, ?)", products_data)
+        else:
+            # Salvataggio su file
+            write_file_atomic(products_file, products_data, backup=True)
 
         logger.info("Dati prodotti salvati con successo")
+
+        return True
     except Exception as e:
         logger.error(f"Errore nel salvataggio dei dati prodotti: {e}")
 
+        return False
+
 
 def load_emails():
     """
@@ -109,12 +164,16 @@ def load_emails():
     """
     global emails
 
-    if os.path.exists(emails_file):
+    if storage_backend == "sqlite" or os.path.exists(emails_file):
         try:
-            with open(emails_file, "r") as file:
-                lines = file.readlines()
-            
-            emails = [line.strip() for line in lines]
+            if storage_backend == "sqlite":
+                with database_lock:
+                    emails = [email for (email,) in get_database().execute("SELECT email FROM emails ORDER BY id")]
+            else:
+                with open(emails_file, "r") as file:
+                    lines = file.readlines()
+                
+                emails = [line.strip() for line in lines]
 
             logger.info("Email caricate correttamente")
         except Exception as e:
@@ -135,497 +194,2209 @@ def load_emails():
 
 
 def save_emails():
+    """
+    Segna le email come da salvare: il salvataggio avviene in background, raggruppando le modifiche ravvicinate
+    """
+    mark_dirty("emails")
+
+
+def write_emails():
     """
     Salva i dati delle email su file
     """
     try:
-        # Salvataggio su file
-        with open(emails_file, 'w') as file:
-            for line in emails:
-                file.write(line + '\n')
+        emails_data = list(emails)
+
+        if storage_backend == "sqlite":
+            # Salvataggio nel database in un'unica transazione
+            with database_lock, get_database() as database:
+                database.execute("DELETE FROM emails")
+                database.executemany("INSERT INTO emails (email) VALUES (?)", ((email,) for email in emails_data))
+        else:
+            # Salvataggio su file
+            write_file_atomic(emails_file, "".join(line + '\n' for line in emails_data))
 
         logger.info("Email salvate con successo")
+
+        return True
     except Exception as e:
         logger.error(f"Errore nel salvataggio delle email: {e}")
 
+        return False
+
 
-def load_prices():
+def write_file_atomic(file_path, content, backup=False):
     """
-    Carica i dati di monitoraggio dei prezzi da file
+    Scrive un file in modo atomico: il contenuto viene scritto in un file temporaneo che sostituisce l'originale
+    solo a scrittura completata e sincronizzata su disco, così un'interruzione non lascia mai il file troncato
+    Con `backup` la versione precedente viene conservata tra le copie di sicurezza usate in caso di file danneggiato
     """
-    global prices
+    temp_file_path = file_path + ".tmp"
 
-    if os.path.exists(prices_file):
-        try:
-            with open(prices_file, "r") as file:
-                prices = json.load(file)
+    # Senza conversione dei fine riga, così le posizioni calcolate sul contenuto corrispondono a quelle nel file
+    with open(temp_file_path, "w", newline="\n") as file:
+        file.write(content)
+
+        # Il contenuto deve essere su disco prima della rinomina, altrimenti un crash può lasciare un file vuoto
+        file.flush()
+        os.fsync(file.fileno())
+
+    if backup:
+        rotate_snapshot_backups(file_path)
+
+    os.replace(temp_file_path, file_path)
+
+    # Su POSIX anche la rinomina va resa persistente sincronizzando la cartella (non supportato su Windows)
+    if os.name != "nt":
+        directory_fd = os.open(os.path.dirname(os.path.abspath(file_path)), os.O_RDONLY)
 
-                # Controllo validità dei dati estratti
-                for name in prices:
-                    if not isinstance(prices[name], list):
-                        raise Exception("Ogni elemento nel file JSON dei dati monitoraggio prezzi deve essere una lista")
-                    
-                logger.info("Dati monitoraggio prezzi caricati correttamente")
-        except Exception as e:
-            logger.error(f"Errore durante il caricamento dei dati monitoraggio prezzi: {e}")
-            messagebox.showerror("Attenzione","Errore durante il caricamento dei dati monitoraggio prezzi")
-            exit()
-    else:
         try:
-            # Crea il file con un dizionario vuoto
-            with open(prices_file, "w") as file:
-                json.dump({}, file)
-            
-            logger.warning(f"File dei dati monitoraggio prezzi '{prices_file}' non trovato, creato nuovo file vuoto")
-            messagebox.showwarning("Attenzione", f"File dei dati monitoraggio prezzi '{prices_file}' non trovato\nCreato nuovo file vuoto.")
-        except Exception as e:
-            logger.error(f"Errore durante la creazione del file dei dati monitoraggio prezzi: {e}")
-            messagebox.showerror("Attenzione", "Errore durante la creazione del file dei dati monitoraggio prezzi")
-            exit()
+            os.fsync(directory_fd)
+        finally:
+            os.close(directory_fd)
 
 
-def save_prices():
+def get_snapshot_backups(file_path):
     """
-    Salva i dati di monitoraggio dei prezzi dei prodotti su file
+    Percorsi delle copie di sicurezza di un file, dalla più recente alla più vecchia
+    """
+    return [f"{file_path}.{index}" for index in range(1, snapshot_backups + 1)]
+
+
+def snapshot_exists(file_path):
+    """
+    Controlla se esiste un file o almeno una delle sue copie di sicurezza
+    """
+    return any(os.path.exists(path) for path in [file_path] + get_snapshot_backups(file_path))
+
+
+def rotate_snapshot_backups(file_path):
+    """
+    Conserva la versione corrente di un file come copia di sicurezza più recente, facendo scorrere le precedenti
+    La rotazione avviene al più una volta ogni `snapshot_backup_interval` secondi, così le copie coprono un arco di tempo utile
     """
+    if not os.path.exists(file_path) or time.time() - snapshot_rotations.get(file_path, 0) < snapshot_backup_interval:
+        return
+    
+    backups = get_snapshot_backups(file_path)
+
+    for index in range(len(backups) - 1, 0, -1):
+        if os.path.exists(backups[index - 1]):
+            os.replace(backups[index - 1], backups[index])
+
+    # Il collegamento evita di copiare il file: la rinomina successiva sostituisce solo il percorso principale
     try:
-        # Salvataggio su file
-        with open(prices_file, "w") as file:
-            json.dump(prices, file, indent=4)
+        os.link(file_path, backups[0])
+    except OSError:
+        shutil.copy2(file_path, backups[0])
 
-        logger.info("Dati di monitoraggio dei prezzi dei prodotti salvati con successo")
-    except Exception as e:
-        logger.error(f"Errore nel salvataggio dei dati di monitoraggio dei prezzi dei prodotti: {e}")
+    snapshot_rotations[file_path] = time.time()
 
 
-def save_price(name, price):
+def load_json_snapshot(file_path, validate):
     """
-    Salva i dati di monitoraggio del prezzo per un prodotto su file
+    Carica e valida un file JSON; se è danneggiato prova le copie di sicurezza, dalla più recente alla più vecchia
+    Il file danneggiato viene rinominato con estensione ".corrupt" per non finire tra le copie di sicurezza
+    Restituisce i dati e il percorso da cui sono stati letti
     """
-    current_time = datetime.datetime.now().strftime("%Y-%m-%d %H:%M:%S")
-    price_entry = {"price": price, "date": current_time}
+    last_error = FileNotFoundError(f"Nessun file valido trovato per '{file_path}'")
+
+    for candidate_path in [file_path] + get_snapshot_backups(file_path):
+        if not os.path.exists(candidate_path):
+            continue
 
-    # Crea la chiave del dizionario qual'ora non esistesse
-    if name not in prices:
-        prices[name] = []
+        try:
+            with open(candidate_path, "r") as file:
+                data = json.load(file)
 
-    # Aggiunta del nuovo prezzo allo storico dei prezzi del prodotto
-    prices[name].append(price_entry)
+            validate(data)
+        except Exception as e:
+            logger.error(f"File '{candidate_path}' non valido: {e}")
+            last_error = e
 
-    # Salvataggio su file
-    try:
-        with open(prices_file, "w") as file:
-            json.dump(prices, file, indent=4)
+            continue
 
-        logger.info(f"Salvato aggiornamento prezzo per {name}: {price}€ al {current_time}")
-    except Exception as e:
-        logger.error(f"Errore nel salvataggio dei dati monitoraggio prezzi: {e}")
+        if candidate_path != file_path:
+            logger.warning(f"File '{file_path}' danneggiato, dati recuperati dalla copia di sicurezza '{candidate_path}'")
 
+            if os.path.exists(file_path):
+                os.replace(file_path, file_path + ".corrupt")
 
-def check_and_save_new_emails():
+        return data, candidate_path
+    
+    raise last_error
+
+
+def mark_dirty(data_kind):
     """
-    Controlla le email associate ai prodotti e aggiorna la lista delle email usate come cronologia
+    Segna un tipo di dati ("products", "prices", "prices_log", "emails") come da salvare e risveglia lo scrittore in background
     """
-    global emails
+    global persistence_thread
 
-    for name in products:
-        emails_and_thresholds = products[name]['emails_and_thresholds']
+    with persistence_condition:
+        persistence_dirty.add(data_kind)
 
-        for email in emails_and_thresholds:
-            if email not in emails:
-                emails.append(email)
+        if persistence_thread is None:
+            persistence_thread = threading.Thread(target=run_persistence_writer, name="persistence", daemon=True)
+            persistence_thread.start()
 
-    save_emails()
+        persistence_condition.notify()
 
 
-def open_images_folder():
+def run_persistence_writer():
     """
-    Funzione per aprire la cartella immagini
+    Ciclo dello scrittore in background: salva i dati segnati come da salvare al più una volta ogni `persistence_flush_interval` secondi,
+    così che molte modifiche ravvicinate (es. l'aggiornamento di tutti i prodotti) producano un'unica scrittura
     """
-    if os.path.exists(images_dir):
-        os.startfile(images_dir)  # Su Windows
-    else:
-        logger.error("La cartella delle immagini non esiste")
-        tk.messagebox.showerror("Errore", "La cartella delle immagini non esiste!")
+    while True:
+        with persistence_condition:
+            while not persistence_dirty:
+                persistence_condition.wait()
 
+            # Attesa dell'intervallo minimo dall'ultima scrittura, raccogliendo nel frattempo altre modifiche
+            while time.time() < persistence_last_flush + persistence_flush_interval:
+                persistence_condition.wait(persistence_last_flush + persistence_flush_interval - time.time())
 
-def clean_products_and_prices_history():
+        flush_persistence()
+
+
+def flush_persistence():
     """
-    Rimuove dalla cronologia di monitoraggio dei prezzi tutti i prodotti che non sono più osservati
+    Salva subito tutti i dati segnati come da salvare (usata anche alla chiusura del programma)
+    I dati la cui scrittura non riesce restano da salvare e vengono riprovati alla scrittura successiva
     """
-    continueCleanProductsAndPricesHistory = messagebox.askyesno(
-                        "Pulizia cronologia",
-                        "Sei sicuro di voler rimuovere dalla cronologia i prodotti non osservati e i relativi prezzi memorizzati?" 
-                    )
+    global persistence_last_flush
 
-    # Verifica risposta
-    if continueCleanProductsAndPricesHistory:
-        name_products = products.keys()
-        name_prices = list(prices.keys())
+    with persistence_write_lock:
+        with persistence_condition:
+            dirty = set(persistence_dirty)
+            persistence_dirty.clear()
+            persistence_last_flush = time.time()
 
-        for name_price in name_prices:
-            if name_price not in name_products:
-                del prices[name_price]
+        # La compattazione dello storico include anche le voci in attesa del log
+        if "prices" in dirty:
+            dirty.discard("prices_log")
 
-        save_prices()
+        for data_kind, write_data in persistence_writers.items():
+            if data_kind in dirty and not write_data():
+                with persistence_condition:
+                    persistence_dirty.add(data_kind)
 
 
-def clean_emails_history():
+def get_database():
     """
-    Ripulisce la lista delle email, rimuovendo quelle non più associate a prodotti monitorati
+    Restituisce la connessione al database SQLite, aprendola e creando le tabelle al primo utilizzo
+    Va usata tenendo `database_lock`: la connessione è condivisa tra l'interfaccia e i thread di monitoraggio
     """
-    global emails
-
-    continueCleanEmailsHistory = messagebox.askyesno(
-                        "Pulizia cronologia",
-                        "Sei sicuro di voler rimuovere dalla cronologia le email non più utilizzate?" 
-                    )
+    global database_connection
 
-    # Verifica risposta
-    if continueCleanEmailsHistory:
-        emails.clear()
+    with database_lock:
+        if database_connection is None:
+            database_connection = sqlite3.connect(database_file, timeout=30, check_same_thread=False)
 
-        for name in products:
-            emails_and_thresholds = products[name]['emails_and_thresholds']
+            # Il journal WAL permette letture concorrenti alle scritture e commit più rapidi
+            database_connection.execute("PRAGMA journal_mode=WAL")
+            database_connection.execute("PRAGMA synchronous=NORMAL")
+            database_connection.executescript("""
+                CREATE TABLE IF NOT EXISTS products (id INTEGER PRIMARY KEY, name TEXT NOT NULL UNIQUE, data TEXT NOT NULL);
+                CREATE TABLE IF NOT EXISTS prices (id INTEGER PRIMARY KEY, product TEXT NOT NULL, timestamp INTEGER NOT NULL, price REAL, price_text TEXT, date_text TEXT);
+                CREATE INDEX IF NOT EXISTS prices_product_timestamp ON prices (product, timestamp);
+                CREATE TABLE IF NOT EXISTS price_stats (product TEXT PRIMARY KEY, data TEXT NOT NULL);
+                CREATE TABLE IF NOT EXISTS emails (id INTEGER PRIMARY KEY, email TEXT NOT NULL);
+            """)
 
-            for email in emails_and_thresholds:
-                if email not in emails:
-                    emails.append(email)
-        
-        save_emails()
+        return database_connection
 
 
-def center_window(window):
+def queue_database_price(name, history, index):
     """
-    Centra una finestra Tkinter sullo schermo
+    Accoda una voce dello storico ai prezzi da salvare nel database
+    I prezzi dei thread di monitoraggio vengono salvati a gruppi, al raggiungimento di `database_batch_size` voci
+    oppure al più tardi dopo `database_commit_interval` secondi
     """
-    window.update_idletasks()
+    global database_flush_timer
 
-    width = window.winfo_width()
-    height = window.winfo_height()
-    screen_width = window.winfo_screenwidth()
-    screen_height = window.winfo_screenheight()
+    with database_lock:
+        database_pending_prices.append((name, *history.get_columns(index)))
+        database_pending_stats.add(name)
 
-    x = (screen_width // 2) - (width // 2)
-    y = (screen_height // 2) - (height // 2)
-    window.geometry(f"{width}x{height}+{x}+{y}")
+        if len(database_pending_prices) >= database_batch_size:
+            flush_database_prices()
+        elif database_flush_timer is None:
+            database_flush_timer = threading.Timer(database_commit_interval, flush_database_prices)
+            database_flush_timer.daemon = True
+            database_flush_timer.start()
 
 
-def open_about_dialog():
+def flush_database_prices():
     """
-    Crea una finestra modale con informazioni personali e di release.
+    Salva nel database, con un unico commit, i prezzi in attesa e le statistiche dei relativi prodotti
+    Le statistiche vengono serializzate con `prices_log_lock`, lo stesso dei thread di monitoraggio che le aggiornano
     """
-    # Creazione della finestra modale
-    about_dialog = tk.Toplevel(root)
-    about_dialog.title("Info")
-    about_dialog.resizable(False, False)
-    about_dialog.configure(padx=50, pady=5)
-    about_dialog.grab_set()
+    global database_flush_timer
 
-    # Label con il nome dell'utente
-    name_label = tk.Label(about_dialog, text="Vincenzo Salvati", font=("Arial", 14, "bold"))
-    name_label.pack(pady=10)
+    # Stesso ordine dei lock di `save_price`: prima `prices_log_lock`, poi `database_lock`
+    with prices_log_lock, database_lock:
+        if database_flush_timer is not None:
+            database_flush_timer.cancel()
+            database_flush_timer = None
 
-    # Label con il numero di versione/release
-    release_label = tk.Label(about_dialog, text="Versione: 3.4.1", font=("Arial", 12))
-    release_label.pack(pady=5)
+        if not database_pending_prices:
+            return
+        
+        rows = database_pending_prices[:]
+        names = set(database_pending_stats)
 
-    # Label con un eventuale numero di release successiva
-    release_note_label = tk.Label(about_dialog, text="Ultima release: 13 ottobre 2024", font=("Arial", 10))
-    release_note_label.pack(pady=5)
+        try:
+            with get_database() as database:
+                database.executemany("INSERT INTO prices (product, timestamp, price, price_text, date_text) VALUES (?, ?, ?, ?, ?)", rows)
+                database.executemany("INSERT OR REPLACE INTO price_stats (product, data) VALUES (?, ?)", ((name, json.dumps(price_stats[name])) for name in names if name in price_stats))
 
-    # Pulsante per chiudere la finestra modale
-    close_button = ttk.Button(about_dialog, text="Chiudi", command=about_dialog.destroy)
-    close_button.pack(pady=15)
+            database_pending_prices.clear()
+            database_pending_stats.clear()
 
-    center_window(about_dialog)
+            logger.info(f"Salvati {len(rows)} prezzi nel database")
+        except Exception as e:
+            # Le voci restano in attesa e verranno salvate al commit successivo
+            logger.error(f"Errore nel salvataggio dei prezzi nel database: {e}")
 
 
-def reset_filters(reset_search_bar=True):
+def migrate_json_to_sqlite():
     """
-    Reimposta i filtri e ordina i prodotti per data di ultima modifica
+    Importa una tantum nel database SQLite i dati dei file JSON: prodotti, storico e log dei prezzi, email
+    La migrazione completata viene registrata in `PRAGMA user_version` nella stessa transazione dell'importazione, così
+    i file JSON, che restano invariati come copia di sicurezza, non vengono reimportati anche se il database si svuota
     """
+    global prices
 
-    # Tentativo di ottenere il lock senza bloccare se è già in uso
-    if reset_filters_lock.acquire(blocking=False):
-        try:
-            global products_to_view, sort_state
+    with database_lock:
+        database = get_database()
 
-            # Reimposta lo stato dell'ordinamento
-            sort_state = {"column": None, "order": 0}
+        if database.execute("PRAGMA user_version").fetchone()[0] >= database_migration_version:
+            return
+        
+        # Database creato prima della registrazione della migrazione: se contiene dati è già stato migrato
+        if database.execute("SELECT EXISTS (SELECT 1 FROM products) OR EXISTS (SELECT 1 FROM prices) OR EXISTS (SELECT 1 FROM emails)").fetchone()[0]:
+            database.execute(f"PRAGMA user_version = {database_migration_version}")
+            return
 
-            # Elenco dei prodotti da visualizzare come lista di tuple
-            list_products_to_view = list(products_to_view.items())
-
-            # Mappa delle funzioni di ordinamento per ciascuna colonna
-            column_key_map = {
-                "Nome": lambda item: item[0].lower(),
-                "URL": lambda item: item[1]["url"].lower(),
-                "Prezzo": lambda item: item[1]["price"] if isinstance(item[1]["price"], (int, float)) else float("inf"),
-                "Notifica": lambda item: item[1]["notify"],
-                "Timer": lambda item: item[1]["timer"],
-                "Timer Aggiornamento [s]": lambda item: item[1]["timer_refresh"],
-                "Data Inserimento": lambda item: item[1]["date_added"],
-                "Data Ultima Modifica": lambda item: item[1]["date_edited"],
-            }
+    try:
+        json_products = {}
 
-            # Ordinamento dei prodotti per data di ultima modifica
-            list_products_to_view.sort(key=column_key_map["Data Ultima Modifica"])
+        if snapshot_exists(products_file):
+            json_products = load_json_snapshot(products_file, validate_products_data)[0]
 
-            # Aggiornamento ordine dei prodotti da visualizzare
-            products_to_view = {name: details for name, details in list_products_to_view}
+        prices = {}
 
-            # Ripristino delle intestazioni delle colonne nella TreeView
-            for column in columns:
-                products_tree.heading(column, text=column, anchor="center")
+        if snapshot_exists(prices_file):
+            prices = {name: PriceHistory(history) for name, history in load_json_snapshot(prices_file, validate_prices_data)[0].items()}
 
-            # Reset della barra di ricerca quando richiesto
-            if reset_search_bar:
-                search_entry.delete(0, tk.END)
-                search_entry.insert(0, placeholder_text)
-                search_entry.config(fg='grey')
-        finally:
-            # Rilascio del lock alla fine dell'esecuzione
-            reset_filters_lock.release()
+        # Prezzi salvati nel log dopo l'ultima compattazione
+        replay_prices_log()
+
+        for name in prices:
+            build_price_stats(name)
+
+        json_emails = []
+
+        if os.path.exists(emails_file):
+            with open(emails_file, "r") as file:
+                json_emails = [line.strip() for line in file]
+
+        with database_lock, database:
+            database.executemany("INSERT INTO products (name, data) VALUES (?, ?)", ((name, json.dumps(product)) for name, product in json_products.items()))
+            database.executemany("INSERT INTO prices (product, timestamp, price, price_text, date_text) VALUES (?, ?, ?, ?, ?)",
+                                 ((name, *history.get_columns(index)) for name, history in prices.items() for index in range(len(history))))
+            database.executemany("INSERT INTO price_stats (product, data) VALUES (?, ?)", ((name, json.dumps(price_stats[name])) for name in prices))
+            database.executemany("INSERT INTO emails (email) VALUES (?)", ((email,) for email in json_emails))
+            database.execute(f"PRAGMA user_version = {database_migration_version}")
+
+        logger.info(f"Migrati nel database '{database_file}' {len(json_products)} prodotti, {sum(len(history) for history in prices.values())} prezzi e {len(json_emails)} email")
+    except Exception as e:
+        logger.error(f"Errore durante la migrazione dei dati JSON nel database: {e}")
+        messagebox.showerror("Attenzione", "Errore durante la migrazione dei dati JSON nel database")
+        exit()
 
 
-def calculate_suggestion(all_prices, current_price, price_average, price_minimum, price_maximum):
+def date_to_timestamp(date):
     """
-    Fornisce suggerimenti sul prezzo attuale basati su statistiche storiche
+    Converte una data "YYYY-mm-dd HH:MM:SS" in secondi dall'epoca (la data viene trattata come UTC per una conversione reversibile)
     """
-    if not isinstance(current_price, (int, float)):
-        return "Prezzo attuale inesistente: aggiorna il prodotto o cambia il suo url", "black"
-    elif all(x == all_prices[0] for x in all_prices):
-        return "Ad oggi non sono state rilevate variazioni di prezzo", "blue"
-    elif current_price <= price_minimum:
-        return "Ottimo momento per comprare!", "green"
-    elif current_price < price_average * 0.9:
-        return "Prezzo inferiore alla media, buon momento per comprare", "green"
-    elif current_price >= price_maximum:
-        return "Prezzo alto rispetto alla storia, considera di aspettare una riduzione", "red"
-    else:
-        return "Prezzo nella media, considera se hai bisogno del prodotto ora", "#FFA500"
+    return int((datetime.datetime.fromisoformat(date) - epoch).total_seconds())
 
 
-def calculate_statistics(all_prices, current_price):
+def timestamp_to_date(timestamp):
     """
-    Calcola le statistiche sui prezzi storici: media, minimo e massimo
+    Converte secondi dall'epoca nella data "YYYY-mm-dd HH:MM:SS" da cui sono stati ottenuti
     """
-    if all_prices:
-        average_price = round(statistics.mean(all_prices), 2)
-        price_minimum = min(all_prices)
-        price_maximum = max(all_prices)
-    else:
-        average_price = price_minimum = price_maximum = current_price
-    
-    return average_price, price_minimum, price_maximum
+    return (epoch + datetime.timedelta(seconds=timestamp)).strftime("%Y-%m-%d %H:%M:%S")
 
 
-def send_notification_and_email(name, previous_price, current_price):
+class PriceHistory(Sequence):
     """
-    Invia una notifica e una e-mail di aggiornamento del prezzo per un prodotto
+    Storico dei prezzi di un prodotto in forma colonnare: prezzi in `array('d')` e date come secondi dall'epoca in `array('q')`
+    Si comporta come la lista di dizionari {"price", "date"} usata in precedenza, mentre grafici e statistiche possono leggere
+    direttamente gli array. I prezzi non numerici (es. "aggiorna o verifica l'URL") valgono NaN e il testo è conservato a parte
+    Lo storico salvato può essere caricato al primo accesso (`source`): fino ad allora gli array contengono solo le nuove voci
     """
-    def load_config():
-        """
-        Carica la configurazione per l'invio di email e notifiche Telegram da file
-        """
-        if os.path.exists(config_file):
-            try:
-                with open(config_file, "r") as file:
-                    config = json.load(file)
-                    
-                    return (config["sender_email"], config["sender_password"], config["receiver_email"], config["url_telegram"], config["chat_id_telegram"])
-            except Exception as e:
-                logger.error(f"Errore nel caricamento del file di configurazione: {e}")
-                messagebox.showerror("Attenzione", "Errore nel caricamento del file di configurazione")
-                exit()
-        else:
-            logger.error(f"File di configurazione '{config_file}' non trovato")
-            messagebox.showerror("Attenzione", f"File di configurazione '{config_file}' non trovato")
-            exit()
-    
-    def send_email(subject, body, image_path, email_to_notify):
+    __slots__ = ("price_values", "timestamp_values", "price_texts", "date_texts", "source", "source_count")
+
+    def __init__(self, entries=(), source=None, source_count=0):
+        self.price_values = array("d")
+        self.timestamp_values = array("q")
+        self.price_texts = {} # Posizione -> prezzo non numerico
+        self.date_texts = {} # Posizione -> data non convertibile in secondi
+        self.source = source # Storico salvato non ancora caricato: ("json", offset, lunghezza) nello snapshot o ("sqlite", prodotto, id massimo)
+        self.source_count = source_count # Numero di voci dello storico salvato non ancora caricato
+
+        for entry in entries:
+            self.append(entry)
+
+    @property
+    def prices(self):
+        self.ensure_loaded()
+        return self.price_values
+
+    @property
+    def timestamps(self):
+        self.ensure_loaded()
+        return self.timestamp_values
+
+    def ensure_loaded(self):
         """
-        Invia un'email con l'oggetto e il corpo al destinatario
+        Carica lo storico salvato, se non ancora caricato, anteponendolo alle voci aggiunte nel frattempo
         """
-        # Carica le credenziali email mittente
-        from_email, from_password, _, _, _ = load_config()
-
-        # Crea il messaggio email
-        msg = MIMEMultipart()
-        msg["From"] = from_email
-        msg["To"] = email_to_notify
-        msg["Subject"] = subject
+        if self.source is None:
+            return
         
-        # Aggiungi il corpo del messaggio
-        msg.attach(MIMEText(body, 'html'))
+        with prices_log_lock:
+            if self.source is None:
+                return
+            
+            history = read_price_history_source(self.source)
+            offset = len(history.price_values)
 
-        # Aggiungi l'immagine se presente
-        if image_path and os.path.isfile(image_path):
-            with open(image_path, 'rb') as img:
-                image = MIMEImage(img.read())
-                image.add_header('Content-ID', '<image1>')
-                msg.attach(image)
+            history.price_values.extend(self.price_values)
+            history.timestamp_values.extend(self.timestamp_values)
+            history.price_texts.update({offset + index: text for index, text in self.price_texts.items()})
+            history.date_texts.update({offset + index: text for index, text in self.date_texts.items()})
 
-        try:
-            server = smtplib.SMTP("smtp.gmail.com", 587) # Imposta connessione al server SMTP
-            server.starttls() # Abilita connessionE TLS
-            server.login(from_email, from_password)
-            server.sendmail(from_email, email_to_notify, msg.as_string())
-            server.quit()
-        except Exception as e:
-            logger.error(f"Impossibile inviare l'email: {e}")
+            self.price_values, self.timestamp_values = history.price_values, history.timestamp_values
+            self.price_texts, self.date_texts = history.price_texts, history.date_texts
+            self.source = None
+            self.source_count = 0
 
-    def send_default_notification(subject, body, body_email, image_path):
+    def append(self, entry):
         """
-        Invia una email e una notifica Telegram al desinatario di default
+        Accoda una voce {"price", "date"} allo storico (senza caricare lo storico salvato)
         """
-        # Carica i contatti del destinatario di default
-        _, _, default_recipient_email, default_url_telegram, default_chat_id_telegram = load_config()
+        index = len(self.price_values)
+        price = entry["price"]
 
-        # Invia email
-        send_email(subject, body_email, image_path, default_recipient_email)
+        if isinstance(price, (int, float)) and not isinstance(price, bool):
+            self.price_values.append(price)
+        else:
+            self.price_values.append(math.nan)
+            self.price_texts[index] = price
 
         try:
-            # Prepara payload per Telegram
-            payload = {"chat_id": default_chat_id_telegram, "text": body}
+            self.timestamp_values.append(date_to_timestamp(entry["date"]))
+        except (TypeError, ValueError):
+            self.timestamp_values.append(0)
+            self.date_texts[index] = entry["date"]
 
-            # Invia notifica Telegram
-            response = requests.post(default_url_telegram, data=payload)
+    def append_columns(self, timestamp, price, price_text=None, date_text=None):
+        """
+        Accoda una voce già in forma colonnare (es. una riga del database), con prezzo None per i prezzi non numerici
+        """
+        index = len(self.price_values)
 
-            # Controllo riuscita dell'invio
-            response.raise_for_status()
-        except requests.exceptions.RequestException as e:
-            logger.error(f"Impossibile inviare il messaggio Telegram: {e}")
-        
-    # Calcola statistiche sui prezzi dello storico del prodotto
-    historical_prices = prices.get(name, [])
-    all_prices = [entry["price"] for entry in historical_prices if isinstance(entry["price"], (int, float))]
-    average_price, price_minimum, price_maximum = calculate_statistics(all_prices, current_price)
+        self.price_values.append(math.nan if price is None else price)
+        self.timestamp_values.append(timestamp)
 
-    # Calcolo del suggerimento per l'utente basato sui prezzi dello storico del prodotto
-    text_suggestion, _ = calculate_suggestion(all_prices, current_price, average_price, price_minimum, price_maximum)
-
-    # Prepara l'oggetto e il corpo della notifica
-    subject = "Prezzo in calo!"
-    if average_price == price_minimum == price_maximum:
-        body = (
-            f"Il prezzo dell'articolo '{name}' è sceso da {previous_price}€ a {current_price}€.\n\n"
-            + "Dettagli:\n\t- Primo ribasso del prezzo rilevato\n\nNon ho abbastanza dati nello storico del prodotto per fornire un suggerimento sulla validità dell'acquisto\n\n"
-            + f"Acquista ora: {products[name]['url']}"
-        )
-        body_email = (
-                f"Il prezzo dell'articolo '{name}' è sceso da {previous_price}€ a {current_price}€.<br><br>"
-                + "Dettagli:<br>\t- Primo ribasso del prezzo rilevato<br><br>"
-                + "Non ho abbastanza dati nello storico del prodotto per fornire un suggerimento sulla validità dell'acquisto.<br><br>"
-                + f"Acquista ora: <a href='{products[name]['url']}'>clicca qui</a><br><br>"
-        )
-    else:
-        body = (
-            f"Il prezzo dell'articolo '{name}' è sceso da {previous_price}€ a {current_price}€.\n\n"
-            + f"Dettagli:\n\t- Prezzo medio: {average_price}€\n\t- Prezzo minimo storico: {price_minimum}€\n\t- Prezzo massimo storico: {price_maximum}€\n\n{text_suggestion}\n\n"
-            + f"Acquista ora: {products[name]['url']}"
-            )
-        body_email = (
-                f"Il prezzo dell'articolo '{name}' è sceso da {previous_price}€ a {current_price}€.<br><br>"
-                + f"Dettagli:<br>\t- Prezzo medio: {average_price}€<br>\t- Prezzo minimo storico: {price_minimum}€<br>\t- Prezzo massimo storico: {price_maximum}€<br><br>"
-                + f"{text_suggestion}<br><br>"
-                + f"Acquista ora: <a href='{products[name]['url']}'>clicca qui</a><br><br>"
-        )
-    
-    image_path = products[name].get('image')
+        if price_text is not None:
+            self.price_texts[index] = price_text
 
-    if image_path and os.path.isfile(image_path):
-        body_email += f"<img src='cid:image1'>"
+        if date_text is not None:
+            self.date_texts[index] = date_text
 
-    # Invio notifica telegram
-    if current_price < previous_price:
-        send_default_notification(subject, body, body_email, image_path)
+    def get_position(self, index):
+        """
+        Posizione negli array di una voce dello storico: le nuove voci sono accessibili anche senza caricare lo storico salvato
+        """
+        if index < 0:
+            index += len(self)
 
-    # Controllo delle soglie e invio delle e-mail
-    for email, threshold in products[name]["emails_and_thresholds"].items():
-        value_to_compare = previous_price
-        subject_to_send = subject
-        body_to_send = body_email
+        if not 0 <= index < len(self):
+            raise IndexError("Indice fuori dallo storico dei prezzi")
+        
+        if self.source is not None:
+            if index >= self.source_count:
+                return index - self.source_count
+            
+            self.ensure_loaded()
 
-        # Tenere conto della soglia nel caso in cui fosse settata
-        if threshold != 0.0:
-            value_to_compare = threshold
-            subject_to_send = "Prezzo inferiore alla soglia indicata!"
-            body_to_send = (
-                        f"Il prezzo dell'articolo '{name}' è al di sotto della soglia di {value_to_compare}€ indicata.<br>"
-                        + f"Il costo attuale è {current_price}€.<br><br>"
-                        + f"Dettagli:<br>\t- Prezzo medio: {average_price}€<br>\t- Prezzo minimo storico: {price_minimum}€<br>\t- Prezzo massimo storico: {price_maximum}€<br><br>"
-                        + f"{text_suggestion}<br><br>"
-                        + f"Acquista ora: <a href='{products[name]['url']}'>clicca qui</a><br><br>"
-            )
+        return index
 
-            if image_path and os.path.isfile(image_path):
-                body_to_send += f"<img src='cid:image1'>"
+    def get_columns(self, index):
+        """
+        Voce in forma colonnare: data in secondi, prezzo (None se non numerico), prezzo non numerico e data non convertibile
+        """
+        position = self.get_position(index)
+        price = self.price_values[position]
 
-        # Invio e-mail in caso di diminuizione del prezzo o diminuizione oltre la soglia
-        if current_price < value_to_compare:
-            send_email(subject_to_send, body_to_send, image_path, email)
+        return (self.timestamp_values[position], None if math.isnan(price) else price, self.price_texts.get(position), self.date_texts.get(position))
 
+    def __len__(self):
+        return self.source_count + len(self.price_values)
 
-def get_last_price(name):
-    """
-    Restituisce l'ultimo prezzo salvato per un determinato prodotto
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return [self[i] for i in range(*index.indices(len(self)))]
+        
+        position = self.get_position(index)
+        
+        return {
+            "price": self.price_texts[position] if position in self.price_texts else self.price_values[position],
+            "date": self.date_texts[position] if position in self.date_texts else timestamp_to_date(self.timestamp_values[position])
+        }
+
+    def latest_index(self):
+        """
+        Posizione della voce con la data più recente (la prima in caso di parità), calcolata sull'array delle date
+        """
+        return max(range(len(self)), key=self.timestamps.__getitem__)
+
+    def to_list(self):
+        """
+        Storico come lista di dizionari {"price", "date"}, per il salvataggio su file
+        """
+        return self[:]
+
+
+def read_price_history_source(source):
+    """
+    Legge lo storico salvato di un prodotto: la porzione dello snapshot indicata dall'indice o le sue righe nel database
+    """
+    history = PriceHistory()
+
+    if source[0] == "sqlite":
+        with database_lock:
+            for row in get_database().execute("SELECT timestamp, price, price_text, date_text FROM prices WHERE product = ? AND id <= ? ORDER BY id", source[1:]):
+                history.append_columns(*row)
+    else:
+        with open(prices_file, "rb") as file:
+            file.seek(source[1])
+
+            for entry in json.loads(file.read(source[2])):
+                history.append(entry)
+
+    return history
+
+
+def load_prices_index():
+    """
+    Carica l'indice con la posizione dello storico di ciascun prodotto nello snapshot
+    Restituisce None se l'indice manca o non corrisponde allo snapshot presente su disco
+    """
+    if not os.path.exists(prices_index_file) or not os.path.exists(prices_file):
+        return None
+    
+    try:
+        with open(prices_index_file, "r") as file:
+            prices_index = json.load(file)
+
+        snapshot_stat = os.stat(prices_file)
+
+        if prices_index["size"] != snapshot_stat.st_size or prices_index["mtime_ns"] != snapshot_stat.st_mtime_ns:
+            logger.warning(f"Indice dello storico '{prices_index_file}' non allineato allo snapshot, lo storico verrà caricato per intero")
+            return None
+        
+        return prices_index
+    except Exception as e:
+        logger.warning(f"Indice dello storico '{prices_index_file}' non leggibile, lo storico verrà caricato per intero: {e}")
+        return None
+
+
+def build_prices_snapshot():
+    """
+    Serializza lo snapshot dello storico dei prezzi, calcolando la posizione nel file dello storico di ciascun prodotto
+    Lo storico non ancora caricato e senza nuove voci viene copiato dal vecchio snapshot senza decodificarlo
+    """
+    parts = []
+    prices_index_products = {}
+    position = 0
+
+    for name, history in prices.items():
+        prefix = ("{\n" if not parts else ",\n") + "    " + json.dumps(name) + ": "
+
+        if history.source is not None and history.source[0] == "json" and not history.price_values:
+            with open(prices_file, "rb") as file:
+                file.seek(history.source[1])
+                chunk = file.read(history.source[2]).decode("ascii")
+        else:
+            chunk = json.dumps(history.to_list(), indent=4).replace("\n", "\n    ")
+
+        position += len(prefix)
+        prices_index_products[name] = [position, len(chunk), len(history)]
+        position += len(chunk)
+
+        parts.append(prefix)
+        parts.append(chunk)
+
+    parts.append("\n}" if parts else "{}")
+
+    return "".join(parts), prices_index_products
+
+
+def load_prices():
+    """
+    Carica i dati di monitoraggio dei prezzi da file, ricostruendo lo storico dallo snapshot e dal log dei nuovi prezzi
+    """
+    global prices, prices_snapshot_log_hash
+
+    prices_snapshot_log_hash = None
+
+    if storage_backend == "sqlite":
+        try:
+            # Lo storico di ciascun prodotto viene letto dal database al primo accesso, fino alle righe presenti all'avvio
+            with database_lock:
+                database = get_database()
+                last_id = database.execute("SELECT IFNULL(MAX(id), 0) FROM prices").fetchone()[0]
+                prices = {name: PriceHistory(source=("sqlite", name, last_id), source_count=count)
+                          for name, count in database.execute("SELECT product, COUNT(*) FROM prices GROUP BY product ORDER BY MIN(id)")}
+
+            load_price_stats()
+
+            logger.info("Dati monitoraggio prezzi caricati correttamente")
+        except Exception as e:
+            logger.error(f"Errore durante il caricamento dei dati monitoraggio prezzi: {e}")
+            messagebox.showerror("Attenzione","Errore durante il caricamento dei dati monitoraggio prezzi")
+            exit()
+
+        return
+
+    prices_path = prices_file
+
+    if snapshot_exists(prices_file):
+        try:
+            prices_index = load_prices_index()
+
+            if prices_index is not None:
+                # Lo storico di ciascun prodotto viene letto dallo snapshot al primo accesso, alla posizione indicata dall'indice
+                prices = {name: PriceHistory(source=("json", offset, length), source_count=count) for name, (offset, length, count) in prices_index["products"].items()}
+                prices_snapshot_log_hash = prices_index["log_hash"]
+            else:
+                prices, prices_path = load_json_snapshot(prices_file, validate_prices_data)
+
+                for name in prices:
+                    # Conversione nello storico colonnare
+                    prices[name] = PriceHistory(prices[name])
+                
+            logger.info("Dati monitoraggio prezzi caricati correttamente")
+        except Exception as e:
+            logger.error(f"Errore durante il caricamento dei dati monitoraggio prezzi: {e}")
+            messagebox.showerror("Attenzione","Errore durante il caricamento dei dati monitoraggio prezzi")
+            exit()
+    else:
+        try:
+            # Crea il file con un dizionario vuoto
+            with open(prices_file, "w") as file:
+                json.dump({}, file)
+            
+            logger.warning(f"File dei dati monitoraggio prezzi '{prices_file}' non trovato, creato nuovo file vuoto")
+            messagebox.showwarning("Attenzione", f"File dei dati monitoraggio prezzi '{prices_file}' non trovato\nCreato nuovo file vuoto.")
+        except Exception as e:
+            logger.error(f"Errore durante la creazione del file dei dati monitoraggio prezzi: {e}")
+            messagebox.showerror("Attenzione", "Errore durante la creazione del file dei dati monitoraggio prezzi")
+            exit()
+
+    try:
+        # Statistiche dei prezzi salvate insieme allo snapshot
+        load_price_stats()
+
+        # Applica allo snapshot i prezzi salvati nel log dopo l'ultima compattazione
+        # (lo snapshot recuperato da una copia di sicurezza viene comunque riscritto come file principale)
+        # Con l'indice la compattazione è rimandata, per non caricare all'avvio lo storico dei prodotti presenti nel log
+        if (replay_prices_log() > 0 and prices_snapshot_log_hash is None) or prices_path != prices_file:
+            save_prices()
+    except Exception as e:
+        logger.error(f"Errore durante il ripristino del log dei prezzi: {e}")
+        messagebox.showerror("Attenzione", "Errore durante il ripristino del log dei prezzi")
+        exit()
+
+
+def validate_prices_data(data):
+    """
+    Controlla la validità dei dati di monitoraggio dei prezzi letti da file
+    """
+    if not isinstance(data, dict):
+        raise Exception("Il file JSON dei dati monitoraggio prezzi deve contenere un dizionario")
+    
+    for name in data:
+        if not isinstance(data[name], list):
+            raise Exception("Ogni elemento nel file JSON dei dati monitoraggio prezzi deve essere una lista")
+
+
+def replay_prices_log():
+    """
+    Applica allo storico in memoria i prezzi registrati nel log append-only
+    Restituisce il numero di voci applicate
+    """
+    global prices_log_entries
+
+    prices_log_entries = 0
+
+    if not os.path.exists(prices_log_file):
+        return 0
+
+    # Voci del log raggruppate per prodotto, nell'ordine di scrittura
+    log_entries = {}
+
+    with open(prices_log_file, "rb") as file:
+        log_content = file.read()
+
+    for line_number, line in enumerate(log_content.decode("utf-8", errors="replace").splitlines(), start=1):
+        line = line.strip()
+
+        if not line:
+            continue
+
+        try:
+            log_entry = json.loads(line)
+            log_entries.setdefault(log_entry["name"], []).append({"price": log_entry["price"], "date": log_entry["date"]})
+        except (ValueError, KeyError, TypeError) as e:
+            # Una riga troncata (es. chiusura improvvisa durante la scrittura) non invalida il resto del log
+            logger.warning(f"Riga {line_number} del log dei prezzi '{prices_log_file}' ignorata: {e}")
+
+    # Compattazione interrotta prima di svuotare il log: lo snapshot include già tutte le voci del log
+    # (con l'indice basta confrontare l'impronta del log compattato, senza caricare lo storico)
+    if prices_snapshot_log_hash is not None:
+        log_included = hashlib.sha256(log_content).hexdigest() == prices_snapshot_log_hash
+    else:
+        log_included = all(prices.get(name, [])[-len(entries):] == entries for name, entries in log_entries.items())
+
+    if log_entries and log_included:
+        logger.info("Log dei prezzi già incluso nello snapshot")
+
+        with open(prices_log_file, "w"):
+            pass
+
+        return 0
+
+    replayed_entries = 0
+
+    for name, entries in log_entries.items():
+        history = prices.setdefault(name, PriceHistory())
+
+        for price_entry in entries:
+            history.append(price_entry)
+            update_price_stats(name, price_entry["price"], price_entry["date"])
+            replayed_entries += 1
+
+    prices_log_entries = replayed_entries
+
+    logger.info(f"Applicate {replayed_entries} voci dal log dei prezzi")
+
+    return replayed_entries
+
+
+def load_price_stats():
+    """
+    Carica le statistiche dei prezzi salvate insieme allo snapshot, ricalcolando quelle mancanti o non allineate allo storico
+    """
+    global price_stats
+
+    price_stats = {}
+
+    if storage_backend == "sqlite":
+        try:
+            with database_lock:
+                price_stats = {name: json.loads(data) for name, data in get_database().execute("SELECT product, data FROM price_stats")}
+        except Exception as e:
+            logger.warning(f"Statistiche dei prezzi nel database non leggibili, verranno ricalcolate: {e}")
+            price_stats = {}
+    elif os.path.exists(prices_stats_file):
+        try:
+            with open(prices_stats_file, "r") as file:
+                price_stats = json.load(file)
+        except Exception as e:
+            logger.warning(f"Statistiche dei prezzi '{prices_stats_file}' non leggibili, verranno ricalcolate: {e}")
+            price_stats = {}
+
+    rebuilt_names = [name for name in prices if price_stats.get(name, {}).get("entries") != len(prices[name]) or "recent_prices" not in price_stats[name]]
+
+    for name in rebuilt_names:
+        build_price_stats(name)
+
+    # Rimozione delle statistiche di prodotti non più presenti nello storico
+    for name in list(price_stats):
+        if name not in prices:
+            del price_stats[name]
+
+    # Nel database le statistiche ricalcolate vengono salvate subito, per non ricalcolarle al prossimo avvio
+    if storage_backend == "sqlite" and rebuilt_names:
+        try:
+            with database_lock, get_database() as database:
+                database.executemany("INSERT OR REPLACE INTO price_stats (product, data) VALUES (?, ?)", ((name, json.dumps(price_stats[name])) for name in rebuilt_names))
+        except Exception as e:
+            logger.warning(f"Errore nel salvataggio delle statistiche dei prezzi ricalcolate: {e}")
+
+
+def build_price_stats(name):
+    """
+    Ricalcola da zero le statistiche dei prezzi di un prodotto scorrendone lo storico
+    """
+    price_stats[name] = {"entries": 0, "count": 0, "sum": 0.0, "min": None, "max": None, "first": None, "last": None, "all_equal": True, "latest_date": None, "latest_price": None, "recent_prices": []}
+
+    history = prices.get(name, PriceHistory())
+
+    # Lettura diretta dell'array dei prezzi: i valori NaN corrispondono ai prezzi non numerici
+    for price in history.prices:
+        update_price_stats(name, None if math.isnan(price) else price)
+
+    if len(history) > 0:
+        latest_entry = history[history.latest_index()]
+        price_stats[name]["latest_date"] = latest_entry["date"]
+        price_stats[name]["latest_price"] = latest_entry["price"]
+
+
+def update_price_stats(name, price, date=None):
+    """
+    Aggiorna in O(1) le statistiche di un prodotto con un nuovo prezzo: numero, somma, minimo, massimo, ultimo prezzo,
+    se tutti i prezzi rilevati sono uguali, la voce con la data più recente e gli ultimi `adaptive_timer_window` prezzi
+    usati dal timer adattivo. I prezzi non numerici vengono solo conteggiati tra le voci dello storico
+    """
+    stats = price_stats.get(name)
+
+    if stats is None:
+        stats = price_stats[name] = {"entries": 0, "count": 0, "sum": 0.0, "min": None, "max": None, "first": None, "last": None, "all_equal": True, "latest_date": None, "latest_price": None, "recent_prices": []}
+
+    stats["entries"] += 1
+
+    # Voce più recente dello storico (la prima in caso di parità), usata da `get_last_price` senza caricare lo storico
+    if date is not None and (stats["latest_date"] is None or date > stats["latest_date"]):
+        stats["latest_date"] = date
+        stats["latest_price"] = price
+
+    # Finestra degli ultimi prezzi dello storico (None per i prezzi non numerici), senza dover caricare lo storico
+    recent_prices = stats.setdefault("recent_prices", [])
+    recent_prices.append(price if isinstance(price, (int, float)) else None)
+
+    if len(recent_prices) > adaptive_timer_window:
+        del recent_prices[:len(recent_prices) - adaptive_timer_window]
+
+    if not isinstance(price, (int, float)):
+        return
+    
+    if stats["count"] == 0:
+        stats["first"] = stats["min"] = stats["max"] = price
+    else:
+        stats["min"] = min(stats["min"], price)
+        stats["max"] = max(stats["max"], price)
+        stats["all_equal"] = stats["all_equal"] and price == stats["first"]
+
+    stats["count"] += 1
+    stats["sum"] += price
+    stats["last"] = price
+
+
+def get_price_stats(name):
+    """
+    Restituisce le statistiche dei prezzi di un prodotto (vuote se non esiste uno storico)
+    """
+    return price_stats.get(name, {"entries": 0, "count": 0, "sum": 0.0, "min": None, "max": None, "first": None, "last": None, "all_equal": True, "latest_date": None, "latest_price": None, "recent_prices": []})
+
+
+def save_prices():
+    """
+    Segna lo storico dei prezzi come da compattare: il salvataggio avviene in background
+    """
+    mark_dirty("prices")
+
+
+def write_prices():
+    """
+    Salva i dati di monitoraggio dei prezzi dei prodotti su file
+    Compatta lo storico: riscrive lo snapshot completo e svuota il log append-only
+    """
+    global prices_log_entries
+
+    if storage_backend == "sqlite":
+        with prices_log_lock:
+            flush_database_prices()
+
+            try:
+                # Le statistiche sono riscritte per intero e lo storico dei prodotti rimossi dalla cronologia viene eliminato
+                with database_lock, get_database() as database:
+                    database.execute("DELETE FROM price_stats")
+                    database.executemany("INSERT INTO price_stats (product, data) VALUES (?, ?)", ((name, json.dumps(price_stats[name])) for name in prices if name in price_stats))
+                    database.execute("DELETE FROM prices WHERE product NOT IN (SELECT product FROM price_stats)")
+
+                logger.info("Dati di monitoraggio dei prezzi dei prodotti salvati con successo")
+
+                return True
+            except Exception as e:
+                logger.error(f"Errore nel salvataggio dei dati di monitoraggio dei prezzi dei prodotti: {e}")
+
+                return False
+
+    with prices_log_lock:
+        try:
+            # Salvataggio su file
+            prices_content, prices_index_products = build_prices_snapshot()
+            write_file_atomic(prices_file, prices_content, backup=True)
+
+            # Lo storico non ancora caricato si trova ora nelle nuove posizioni dello snapshot
+            for name, history in prices.items():
+                if history.source is not None:
+                    history.source = ("json", *prices_index_products[name][:2])
+
+            # Indice delle posizioni nello snapshot, legato alla dimensione e alla data di modifica del file
+            # e all'impronta del log incluso nello snapshot
+            snapshot_stat = os.stat(prices_file)
+            log_content = b""
+
+            if os.path.exists(prices_log_file):
+                with open(prices_log_file, "rb") as file:
+                    log_content = file.read()
+
+            write_file_atomic(prices_index_file, json.dumps({"size": snapshot_stat.st_size, "mtime_ns": snapshot_stat.st_mtime_ns,
+                                                             "log_hash": hashlib.sha256(log_content).hexdigest(), "products": prices_index_products}))
+
+            # Le statistiche vengono salvate insieme allo snapshot a cui si riferiscono
+            write_file_atomic(prices_stats_file, json.dumps(price_stats))
+
+            # Lo snapshot contiene ora tutte le voci del log, comprese quelle ancora in attesa, e il log può essere svuotato
+            with open(prices_log_file, "w"):
+                pass
+
+            prices_log_pending.clear()
+            prices_log_entries = 0
+
+            logger.info("Dati di monitoraggio dei prezzi dei prodotti salvati con successo")
+
+            return True
+        except Exception as e:
+            logger.error(f"Errore nel salvataggio dei dati di monitoraggio dei prezzi dei prodotti: {e}")
+
+            return False
+
+
+def write_prices_log():
+    """
+    Accoda al log append-only, con un'unica scrittura, le voci dei prezzi in attesa
+    """
+    with prices_log_lock:
+        if not prices_log_pending:
+            return True
+        
+        try:
+            with open(prices_log_file, "a") as file:
+                file.write("".join(prices_log_pending))
+
+            logger.info(f"Accodati {len(prices_log_pending)} prezzi al log dei prezzi")
+
+            prices_log_pending.clear()
+
+            return True
+        except Exception as e:
+            logger.error(f"Errore nel salvataggio dei dati monitoraggio prezzi: {e}")
+
+            return False
+
+
+def save_price(name, price):
+    """
+    Salva i dati di monitoraggio del prezzo per un prodotto su file
+    Il nuovo prezzo viene accodato al log append-only, senza riscrivere l'intero storico, dallo scrittore in background
+    """
+    global prices_log_entries
+
+    current_time = datetime.datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+    price_entry = {"price": price, "date": current_time}
+
+    with prices_log_lock:
+        # Crea la chiave del dizionario qual'ora non esistesse
+        if name not in prices:
+            prices[name] = PriceHistory()
+
+        # Aggiunta del nuovo prezzo allo storico dei prezzi del prodotto
+        prices[name].append(price_entry)
+        update_price_stats(name, price, current_time)
+
+        # Nel database il prezzo viene salvato con il prossimo commit a gruppi
+        if storage_backend == "sqlite":
+            queue_database_price(name, prices[name], len(prices[name]) - 1)
+
+            logger.info(f"Salvato aggiornamento prezzo per {name}: {price}€ al {current_time}")
+
+            return
+
+        # Voce in attesa di essere accodata al log insieme alle altre raccolte nello stesso intervallo
+        prices_log_pending.append(json.dumps({"name": name, "price": price, "date": current_time}) + "\n")
+        prices_log_entries += 1
+
+        logger.info(f"Salvato aggiornamento prezzo per {name}: {price}€ al {current_time}")
+
+    # Compattazione periodica del log nello snapshot
+    if prices_log_entries >= prices_log_compaction_threshold:
+        save_prices()
+    else:
+        mark_dirty("prices_log")
+
+
+def check_and_save_new_emails():
+    """
+    Controlla le email associate ai prodotti e aggiorna la lista delle email usate come cronologia
+    """
+    global emails
+
+    for name in products:
+        emails_and_thresholds = products[name]['emails_and_thresholds']
+
+        for email in emails_and_thresholds:
+            if email not in emails:
+                emails.append(email)
+
+    save_emails()
+
+
+def open_images_folder():
+    """
+    Funzione per aprire la cartella immagini
+    """
+    if os.path.exists(images_dir):
+        os.startfile(images_dir)  # Su Windows
+    else:
+        logger.error("La cartella delle immagini non esiste")
+        tk.messagebox.showerror("Errore", "La cartella delle immagini non esiste!")
+
+
+def clean_products_and_prices_history():
+    """
+    Rimuove dalla cronologia di monitoraggio dei prezzi tutti i prodotti che non sono più osservati
+    """
+    continueCleanProductsAndPricesHistory = messagebox.askyesno(
+                        "Pulizia cronologia",
+                        "Sei sicuro di voler rimuovere dalla cronologia i prodotti non osservati e i relativi prezzi memorizzati?" 
+                    )
+
+    # Verifica risposta
+    if continueCleanProductsAndPricesHistory:
+        # Stessi lock dei thread di monitoraggio e dello scrittore in background, che leggono prodotti e storico in parallelo
+        with check_price_lock, prices_log_lock:
+            name_products = products.keys()
+            name_prices = list(prices.keys())
+
+            for name_price in name_prices:
+                if name_price not in name_products:
+                    del prices[name_price]
+                    price_stats.pop(name_price, None)
+
+        save_prices()
+
+
+def clean_emails_history():
+    """
+    Ripulisce la lista delle email, rimuovendo quelle non più associate a prodotti monitorati
+    """
+    global emails
+
+    continueCleanEmailsHistory = messagebox.askyesno(
+                        "Pulizia cronologia",
+                        "Sei sicuro di voler rimuovere dalla cronologia le email non più utilizzate?" 
+                    )
+
+    # Verifica risposta
+    if continueCleanEmailsHistory:
+        emails.clear()
+
+        for name in products:
+            emails_and_thresholds = products[name]['emails_and_thresholds']
+
+            for email in emails_and_thresholds:
+                if email not in emails:
+                    emails.append(email)
+        
+        save_emails()
+
+
+def center_window(window):
+    """
+    Centra una finestra Tkinter sullo schermo
+    """
+    window.update_idletasks()
+
+    width = window.winfo_width()
+    height = window.winfo_height()
+    screen_width = window.winfo_screenwidth()
+    screen_height = window.winfo_screenheight()
+
+    x = (screen_width // 2) - (width // 2)
+    y = (screen_height // 2) - (height // 2)
+    window.geometry(f"{width}x{height}+{x}+{y}")
+
+
+def open_about_dialog():
+    """
+    Crea una finestra modale con informazioni personali e di release.
+    """
+    # Creazione della finestra modale
+    about_dialog = tk.Toplevel(root)
+    about_dialog.title("Info")
+    about_dialog.resizable(False, False)
+    about_dialog.configure(padx=50, pady=5)
+    about_dialog.grab_set()
+
+    # Label con il nome dell'utente
+    name_label = tk.Label(about_dialog, text="Vincenzo Salvati", font=("Arial", 14, "bold"))
+    name_label.pack(pady=10)
+
+    # Label con il numero di versione/release
+    release_label = tk.Label(about_dialog, text="Versione: 3.4.1", font=("Arial", 12))
+    release_label.pack(pady=5)
+
+    # Label con un eventuale numero di release successiva
+    release_note_label = tk.Label(about_dialog, text="Ultima release: 13 ottobre 2024", font=("Arial", 10))
+    release_note_label.pack(pady=5)
+
+    # Pulsante per chiudere la finestra modale
+    close_button = ttk.Button(about_dialog, text="Chiudi", command=about_dialog.destroy)
+    close_button.pack(pady=15)
+
+    center_window(about_dialog)
+
+
+def calculate_sort_key(column, name):
+    """
+    Chiave di ordinamento di un prodotto per una colonna della TreeView
+    """
+    details = products[name]
+
+    if column == "Nome":
+        return name.lower()
+    elif column == "URL":
+        return details["url"].lower()
+    elif column == "Prezzo":
+        return details["price"] if isinstance(details["price"], (int, float)) else float("inf")
+    elif column == "Notifica":
+        return details["notify"]
+    elif column == "Timer":
+        # La scadenza ordina i prodotti come il tempo rimanente, ma non cambia col passare del tempo
+        return details["timer"] + details.get("timer_effective", details["timer_refresh"])
+    elif column == "Timer Aggiornamento [s]":
+        # Stesso valore mostrato nella colonna: l'intervallo effettivo per i prodotti in modalità adattiva
+        return details.get("timer_effective", details["timer_refresh"])
+    elif column == "Data Inserimento":
+        return details["date_added"]
+    else:
+        return details["date_edited"]
+
+
+def build_sort_indexes():
+    """
+    Costruisce da zero gli indici ordinati di tutti i prodotti per ciascuna colonna e l'indice di ricerca
+    """
+    for name in products:
+        index_product_search(name)
+
+    with sort_indexes_lock:
+        for column in columns:
+            sort_index_keys[column] = {name: calculate_sort_key(column, name) for name in products}
+            sort_indexes[column] = sorted((key, name) for name, key in sort_index_keys[column].items())
+
+
+def index_product(name):
+    """
+    Aggiorna in modo incrementale gli indici ordinati e l'indice di ricerca dopo l'aggiunta o la modifica di un prodotto
+    """
+    index_product_search(name)
+
+    with sort_indexes_lock:
+        for column in columns:
+            new_key = calculate_sort_key(column, name)
+            column_keys = sort_index_keys.setdefault(column, {})
+            column_index = sort_indexes.setdefault(column, [])
+
+            if name in column_keys:
+                if column_keys[name] == new_key:
+                    continue
+
+                # Rimozione della vecchia posizione tramite ricerca binaria
+                del column_index[bisect.bisect_left(column_index, (column_keys[name], name))]
+
+            bisect.insort(column_index, (new_key, name))
+            column_keys[name] = new_key
+
+
+def unindex_product(name):
+    """
+    Rimuove un prodotto dagli indici ordinati e dall'indice di ricerca
+    """
+    unindex_product_search(name)
+
+    with sort_indexes_lock:
+        for column in columns:
+            if name in sort_index_keys.get(column, {}):
+                del sort_indexes[column][bisect.bisect_left(sort_indexes[column], (sort_index_keys[column].pop(name), name))]
+
+
+def get_sorted_products(column, products_to_sort, reverse=False):
+    """
+    Restituisce i prodotti di `products_to_sort` ordinati per colonna scorrendo l'indice già ordinato, senza riordinarli
+    """
+    with sort_indexes_lock:
+        # Ricostruzione dell'indice qual'ora non fosse allineato ai prodotti
+        if len(sort_index_keys.get(column, {})) != len(products):
+            build_sort_indexes()
+
+        # Pochi prodotti (es. risultati di una ricerca): si ordinano direttamente con le chiavi già calcolate
+        if len(products_to_sort) * 8 < len(products):
+            column_keys = sort_index_keys[column]
+
+            return {name: products[name] for name in sorted(products_to_sort, key=lambda name: (column_keys[name], name), reverse=reverse)}
+
+        column_index = reversed(sort_indexes[column]) if reverse else sort_indexes[column]
+
+        return {name: products[name] for _, name in column_index if name in products_to_sort}
+
+
+def reset_filters(reset_search_bar=True):
+    """
+    Reimposta i filtri e ordina i prodotti per data di ultima modifica
+    """
+
+    # Tentativo di ottenere il lock senza bloccare se è già in uso
+    if reset_filters_lock.acquire(blocking=False):
+        try:
+            global products_to_view, sort_state
+
+            # Reimposta lo stato dell'ordinamento
+            sort_state = {"column": None, "order": 0}
+
+            # Ordinamento dei prodotti per data di ultima modifica tramite l'indice già ordinato
+            products_to_view = get_sorted_products("Data Ultima Modifica", products_to_view)
+
+            # Ripristino delle intestazioni delle colonne nella TreeView
+            for column in columns:
+                products_tree.heading(column, text=column, anchor="center")
+
+            # Reset della barra di ricerca quando richiesto
+            if reset_search_bar:
+                search_entry.delete(0, tk.END)
+                search_entry.insert(0, placeholder_text)
+                search_entry.config(fg='grey')
+        finally:
+            # Rilascio del lock alla fine dell'esecuzione
+            reset_filters_lock.release()
+
+
+def calculate_suggestion(stats, current_price, price_average, price_minimum, price_maximum):
+    """
+    Fornisce suggerimenti sul prezzo attuale basati su statistiche storiche
+    """
+    if not isinstance(current_price, (int, float)):
+        return "Prezzo attuale inesistente: aggiorna il prodotto o cambia il suo url", "black"
+    elif stats["all_equal"]:
+        return "Ad oggi non sono state rilevate variazioni di prezzo", "blue"
+    elif current_price <= price_minimum:
+        return "Ottimo momento per comprare!", "green"
+    elif current_price < price_average * 0.9:
+        return "Prezzo inferiore alla media, buon momento per comprare", "green"
+    elif current_price >= price_maximum:
+        return "Prezzo alto rispetto alla storia, considera di aspettare una riduzione", "red"
+    else:
+        return "Prezzo nella media, considera se hai bisogno del prodotto ora", "#FFA500"
+
+
+def calculate_statistics(stats, current_price):
+    """
+    Calcola le statistiche sui prezzi storici: media, minimo e massimo, a partire dai valori aggregati del prodotto
+    """
+    if stats["count"]:
+        average_price = round(stats["sum"] / stats["count"], 2)
+        price_minimum = stats["min"]
+        price_maximum = stats["max"]
+    else:
+        average_price = price_minimum = price_maximum = current_price
+    
+    return average_price, price_minimum, price_maximum
+
+
+def load_config():
+    """
+    Restituisce la configurazione per l'invio di email e notifiche Telegram
+    Il file viene riletto solo se la sua data di modifica è cambiata dalla lettura precedente
+    Solleva un'eccezione se il file manca o non contiene tutte le chiavi richieste
+    """
+    global config_cache, config_cache_mtime
+
+    if not os.path.exists(config_file):
+        raise Exception(f"File di configurazione '{config_file}' non trovato")
+    
+    config_mtime = os.stat(config_file).st_mtime_ns
+
+    with config_lock:
+        if config_cache is None or config_mtime != config_cache_mtime:
+            # Una configurazione non valida non deve restare in cache al posto di quella precedente
+            config_cache = None
+
+            with open(config_file, "r") as file:
+                config = json.load(file)
+
+            missing_keys = [key for key in config_required_keys if key not in config]
+
+            if missing_keys:
+                raise Exception(f"Chiavi mancanti nel file di configurazione: {', '.join(missing_keys)}")
+            
+            config_cache = config
+            config_cache_mtime = config_mtime
+
+            logger.info("Configurazione delle notifiche caricata correttamente")
+
+        return config_cache
+
+
+def get_smtp_settings(config):
+    """
+    Parametri del server SMTP: le chiavi facoltative "smtp_host", "smtp_port", "smtp_starttls" e "smtp_login" della configurazione
+    permettono di usare un server diverso da Gmail, ad esempio un server SMTP locale di prova senza TLS né autenticazione
+    """
+    return (config.get("smtp_host", "smtp.gmail.com"), int(config.get("smtp_port", 587)), config.get("smtp_starttls", True), config.get("smtp_login", True))
+
+
+def open_smtp_session(config):
+    """
+    Apre una nuova connessione al server SMTP, con STARTTLS e autenticazione se previsti dalla configurazione
+    """
+    smtp_host, smtp_port, smtp_starttls, smtp_login = get_smtp_settings(config)
+
+    server = smtplib.SMTP(smtp_host, smtp_port, timeout=smtp_timeout) # Imposta connessione al server SMTP
+
+    try:
+        if smtp_starttls:
+            server.starttls() # Abilita connessione TLS
+
+        if smtp_login:
+            server.login(config["sender_email"], config["sender_password"])
+    except Exception:
+        close_smtp_session(server)
+        raise
+
+    return server
+
+
+def close_smtp_session(server):
+    """
+    Chiude una connessione SMTP, ignorando gli errori di una connessione già interrotta
+    """
+    try:
+        server.quit()
+    except Exception:
+        server.close()
+
+
+def send_smtp_message(config, from_email, to_email, message):
+    """
+    Invia un messaggio riutilizzando una connessione SMTP già autenticata del pool, se disponibile
+    Le connessioni inattive da più di `smtp_idle_timeout` secondi vengono chiuse; se una connessione riutilizzata risulta interrotta
+    l'invio viene ripetuto una volta con una nuova connessione
+    """
+    session_key = (*get_smtp_settings(config)[:2], from_email)
+
+    while True:
+        server = None
+        expired_servers = []
+
+        with smtp_pool_lock:
+            idle_sessions = smtp_pool.get(session_key, [])
+
+            while idle_sessions:
+                idle_server, last_used = idle_sessions.pop()
+
+                if time.time() - last_used < smtp_idle_timeout:
+                    server = idle_server
+                    break
+
+                expired_servers.append(idle_server)
+
+        for expired_server in expired_servers:
+            close_smtp_session(expired_server)
+
+        reused = server is not None
+
+        if not reused:
+            server = open_smtp_session(config)
+
+        try:
+            server.sendmail(from_email, to_email, message)
+        except (smtplib.SMTPServerDisconnected, OSError):
+            close_smtp_session(server)
+
+            # Connessione scaduta lato server mentre era nel pool: nuovo tentativo con una connessione nuova
+            if reused:
+                logger.info("Connessione SMTP del pool interrotta, nuovo tentativo con una nuova connessione")
+                continue
+
+            raise
+        except smtplib.SMTPException:
+            # Errore sul singolo messaggio (es. destinatario rifiutato): la connessione resta utilizzabile
+            release_smtp_session(session_key, server)
+            raise
+
+        release_smtp_session(session_key, server)
+
+        return
+
+
+def release_smtp_session(session_key, server):
+    """
+    Rimette nel pool una connessione SMTP dopo l'invio, chiudendola se il pool è già pieno
+    """
+    with smtp_pool_lock:
+        idle_sessions = smtp_pool.setdefault(session_key, [])
+
+        if len(idle_sessions) < smtp_pool_max_idle:
+            idle_sessions.append((server, time.time()))
+            schedule_smtp_sweep()
+            return
+        
+    close_smtp_session(server)
+
+
+def schedule_smtp_sweep():
+    """
+    Pianifica la chiusura delle connessioni inattive alla prossima scadenza di `smtp_idle_timeout`, se non già pianificata
+    Deve essere chiamata con `smtp_pool_lock` acquisito
+    """
+    global smtp_sweep_timer
+
+    last_used_times = [last_used for idle_sessions in smtp_pool.values() for _, last_used in idle_sessions]
+
+    if smtp_sweep_timer is not None or not last_used_times:
+        return
+    
+    smtp_sweep_timer = threading.Timer(max(0, min(last_used_times) + smtp_idle_timeout - time.time()), sweep_smtp_sessions)
+    smtp_sweep_timer.daemon = True
+    smtp_sweep_timer.start()
+
+
+def sweep_smtp_sessions():
+    """
+    Chiude con QUIT le connessioni del pool inattive da più di `smtp_idle_timeout` secondi, senza attendere il prossimo invio,
+    e ripianifica il controllo finché nel pool restano connessioni
+    """
+    global smtp_sweep_timer
+
+    expired_servers = []
+
+    with smtp_pool_lock:
+        smtp_sweep_timer = None
+        now = time.time()
+
+        for session_key in list(smtp_pool):
+            idle_sessions = smtp_pool[session_key]
+
+            expired_servers.extend(server for server, last_used in idle_sessions if now - last_used >= smtp_idle_timeout)
+            idle_sessions[:] = [(server, last_used) for server, last_used in idle_sessions if now - last_used < smtp_idle_timeout]
+
+            if not idle_sessions:
+                del smtp_pool[session_key]
+
+        schedule_smtp_sweep()
+
+    for server in expired_servers:
+        close_smtp_session(server)
+
+    if expired_servers:
+        logger.info(f"Chiuse {len(expired_servers)} connessioni SMTP inattive")
+
+
+def close_smtp_sessions():
+    """
+    Chiude tutte le connessioni SMTP inattive del pool (alla chiusura del programma)
+    """
+    global smtp_sweep_timer
+
+    with smtp_pool_lock:
+        if smtp_sweep_timer is not None:
+            smtp_sweep_timer.cancel()
+            smtp_sweep_timer = None
+
+        idle_servers = [server for idle_sessions in smtp_pool.values() for server, _ in idle_sessions]
+        smtp_pool.clear()
+
+    for server in idle_servers:
+        close_smtp_session(server)
+
+
+def deliver_email(notification):
+    """
+    Invia un'email accodata con l'oggetto e il corpo al destinatario, sollevando un'eccezione se l'invio non riesce
+    """
+    config = load_config()
+
+    # Credenziali email mittente
+    from_email = config["sender_email"]
+
+    # Crea il messaggio email
+    msg = MIMEMultipart()
+    msg["From"] = from_email
+    msg["To"] = notification["email_to_notify"]
+    msg["Subject"] = notification["subject"]
+    
+    # Aggiungi il corpo del messaggio
+    msg.attach(MIMEText(notification["body"], 'html'))
+
+    # Aggiungi le immagini presenti, ciascuna con il Content-ID richiamato nel corpo
+    for content_id, image_path in notification["images"]:
+        if image_path and os.path.isfile(image_path):
+            with open(image_path, 'rb') as img:
+                image = MIMEImage(img.read())
+                image.add_header('Content-ID', f'<{content_id}>')
+                msg.attach(image)
+
+    send_smtp_message(config, from_email, notification["email_to_notify"], msg.as_string())
+
+
+def deliver_telegram_message(notification):
+    """
+    Invia una notifica Telegram accodata al destinatario di default, sollevando un'eccezione se l'invio non riesce
+    """
+    config = load_config()
+
+    # Prepara payload per Telegram
+    payload = {"chat_id": config["chat_id_telegram"], "text": notification["text"]}
+
+    # Invia notifica Telegram
+    response = http_post(config["url_telegram"], data=payload)
+
+    # Controllo riuscita dell'invio
+    response.raise_for_status()
+
+
+def enqueue_notification(notification):
+    """
+    Accoda un invio (email o messaggio Telegram) alla coda limitata delle notifiche, consegnate da `notification_workers` thread
+    in background così che i controlli dei prezzi non attendano i server SMTP e Telegram
+    Se la coda è piena l'invio viene registrato nel file delle notifiche non consegnate
+    """
+    notification.setdefault("attempts", 0)
+
+    with notification_lock:
+        if not notification_threads:
+            for _ in range(notification_workers):
+                notification_thread = threading.Thread(target=run_notification_worker, name="notification", daemon=True)
+                notification_thread.start()
+                notification_threads.append(notification_thread)
+
+    try:
+        notification_queue.put_nowait(notification)
+    except queue.Full:
+        write_dead_letter_notification(notification, "coda delle notifiche piena")
+
+
+def run_notification_worker():
+    """
+    Ciclo di un thread di invio delle notifiche: un invio non riuscito viene ritentato con attesa esponenziale, fino a
+    `notification_max_attempts` tentativi, mentre gli errori definitivi finiscono subito tra le notifiche non consegnate
+    """
+    while True:
+        notification = notification_queue.get()
+
+        try:
+            notification_senders[notification["kind"]](notification)
+
+            logger.info(f"Notifica ({notification['kind']}) inviata con successo")
+        except Exception as e:
+            notification["attempts"] += 1
+
+            if is_permanent_notification_error(e) or notification["attempts"] >= notification_max_attempts:
+                write_dead_letter_notification(notification, e)
+            else:
+                retry_delay = min(notification_retry_base * 2 ** (notification["attempts"] - 1), notification_retry_max)
+
+                logger.warning(f"Invio della notifica ({notification['kind']}) non riuscito, nuovo tentativo tra {retry_delay}s: {e}")
+
+                with notification_lock:
+                    retry_timer = threading.Timer(retry_delay, retry_notification, (notification,))
+                    retry_timer.daemon = True
+                    notification_retries[id(notification)] = (retry_timer, notification)
+                    retry_timer.start()
+        finally:
+            notification_queue.task_done()
+
+
+def retry_notification(notification):
+    """
+    Riaccoda una notifica al termine dell'attesa prima del nuovo tentativo
+    """
+    with notification_lock:
+        if notification_retries.pop(id(notification), None) is None:
+            return
+        
+    enqueue_notification(notification)
+
+
+def is_permanent_notification_error(error):
+    """
+    Controlla se un errore di invio è definitivo, cioè se un nuovo tentativo non può riuscire:
+    destinatario o mittente rifiutato, credenziali errate, richiesta Telegram non valida
+    """
+    if isinstance(error, (smtplib.SMTPRecipientsRefused, smtplib.SMTPSenderRefused, smtplib.SMTPAuthenticationError)):
+        return True
+    
+    if isinstance(error, requests.HTTPError) and error.response is not None:
+        return 400 <= error.response.status_code < 500 and error.response.status_code != 429
+    
+    return False
+
+
+def write_dead_letter_notification(notification, error):
+    """
+    Registra nel file delle notifiche non consegnate un invio fallito definitivamente, per poterlo verificare o ripetere
+    """
+    logger.error(f"Notifica ({notification['kind']}) non consegnata dopo {notification['attempts']} tentativi: {error}")
+
+    dead_letter = {"date": datetime.datetime.now().strftime("%Y-%m-%d %H:%M:%S"), "error": str(error), **notification}
+
+    with notification_dead_letter_lock:
+        try:
+            with open(notifications_dead_letter_file, "a") as file:
+                file.write(json.dumps(dead_letter) + "\n")
+        except Exception as e:
+            logger.error(f"Errore nel salvataggio della notifica non consegnata: {e}")
+
+
+def shutdown_notification_queue(timeout):
+    """
+    Attende fino a `timeout` secondi la consegna delle notifiche in coda (alla chiusura del programma)
+    Le notifiche non ancora consegnate, comprese quelle in attesa di un nuovo tentativo, vengono registrate tra le non consegnate
+    """
+    deadline = time.time() + timeout
+
+    while notification_queue.unfinished_tasks and time.time() < deadline:
+        time.sleep(0.1)
+
+    while True:
+        try:
+            notification = notification_queue.get_nowait()
+        except queue.Empty:
+            break
+
+        write_dead_letter_notification(notification, "programma chiuso prima dell'invio")
+        notification_queue.task_done()
+
+    with notification_lock:
+        pending_retries = list(notification_retries.values())
+        notification_retries.clear()
+
+    for retry_timer, notification in pending_retries:
+        retry_timer.cancel()
+        write_dead_letter_notification(notification, "programma chiuso prima del nuovo tentativo")
+
+
+def add_to_notification_digest(kind, item, recipient=None):
+    """
+    Aggiunge una notifica al riepilogo in corso: durante un aggiornamento di più prodotti oppure, se `notification_digest_window`
+    è maggiore di zero, per i controlli periodici nell'arco di quella finestra
+    Restituisce False se il riepilogo non è attivo e la notifica va inviata subito
+    """
+    global notification_digest_timer
+
+    with notification_digest_lock:
+        if notification_digest_batches == 0 and notification_digest_window <= 0:
+            return False
+        
+        if kind == "telegram":
+            notification_digest["telegram"].append(item)
+        else:
+            notification_digest["emails"].setdefault(recipient, []).append(item)
+
+        # Fuori da un aggiornamento il riepilogo viene inviato allo scadere della finestra
+        if notification_digest_batches == 0 and notification_digest_timer is None:
+            notification_digest_timer = threading.Timer(notification_digest_window, flush_notification_digest)
+            notification_digest_timer.daemon = True
+            notification_digest_timer.start()
+
+        return True
+
+
+def start_notification_digest():
+    """
+    Avvia la raccolta delle notifiche in un riepilogo (es. durante l'aggiornamento di tutti i prodotti)
+    """
+    global notification_digest_batches
+
+    with notification_digest_lock:
+        notification_digest_batches += 1
+
+
+def stop_notification_digest():
+    """
+    Termina la raccolta avviata da `start_notification_digest` e invia il riepilogo se non restano altre raccolte in corso
+    """
+    global notification_digest_batches
+
+    with notification_digest_lock:
+        notification_digest_batches -= 1
+        
+        if notification_digest_batches > 0:
+            return
+
+    flush_notification_digest()
+
+
+def flush_notification_digest():
+    """
+    Invia le notifiche raccolte: un unico messaggio Telegram e un'unica email per destinatario con tutti i prodotti il cui prezzo
+    è sceso, allegando una sola volta ciascuna immagine con un proprio Content-ID. Una notifica singola viene inviata invariata
     """
-    if name in prices:
-        last_entry = max(prices[name], key=lambda x: x["date"])
+    global notification_digest_timer
 
-        return last_entry["price"]
+    with notification_digest_lock:
+        if notification_digest_timer is not None:
+            notification_digest_timer.cancel()
+            notification_digest_timer = None
+
+        telegram_texts = notification_digest["telegram"]
+        emails_by_recipient = notification_digest["emails"]
+        notification_digest["telegram"] = []
+        notification_digest["emails"] = {}
+
+    if len(telegram_texts) == 1:
+        telegram_header = ""
+    else:
+        telegram_header = f"Riepilogo: {len(telegram_texts)} ribassi di prezzo rilevati.\n\n"
+
+    for text in split_telegram_digest(telegram_texts, telegram_header):
+        enqueue_notification({"kind": "telegram", "text": text})
+
+    for recipient, emails_to_send in emails_by_recipient.items():
+        if len(emails_to_send) == 1:
+            subject, body, image_path = emails_to_send[0]
+            enqueue_notification({"kind": "email", "subject": subject, "body": body, "images": [["image1", image_path]] if image_path else [], "email_to_notify": recipient})
+            continue
+
+        email_parts = split_email_digest(emails_to_send)
+
+        for part_number, (bodies, content_ids) in enumerate(email_parts, 1):
+            subject = f"Riepilogo prezzi: {len(emails_to_send)} articoli"
+            body = f"Riepilogo: {len(emails_to_send)} articoli segnalati.<br><br><hr>"
+
+            if len(email_parts) > 1:
+                subject += f" (parte {part_number} di {len(email_parts)})"
+                body = f"Riepilogo: {len(emails_to_send)} articoli segnalati (parte {part_number} di {len(email_parts)}).<br><br><hr>"
+
+            images = [[content_id, image_path] for image_path, content_id in content_ids.items()]
+
+            enqueue_notification({"kind": "email", "subject": subject, "body": body + "<hr>".join(bodies), "images": images, "email_to_notify": recipient})
+
+    if telegram_texts or emails_by_recipient:
+        logger.info(f"Riepilogo notifiche inviato: {len(telegram_texts)} messaggi Telegram e {len(emails_by_recipient)} destinatari email")
+
+
+def split_telegram_digest(texts, header):
+    """
+    Divide i messaggi di un riepilogo Telegram in messaggi di al massimo `telegram_max_message_length` caratteri (oltre il limite
+    Telegram rifiuta la richiesta); l'intestazione compare solo nel primo messaggio e un testo più lungo del limite viene spezzato
+    """
+    separator = "\n\n----------\n\n"
+    messages = []
+    message = header
+    message_empty = True # Nessun testo ancora aggiunto al messaggio corrente (l'eventuale intestazione non conta)
+
+    for text in texts:
+        addition = text if message_empty else separator + text
+
+        if not message_empty and len(message) + len(addition) > telegram_max_message_length:
+            messages.append(message)
+            message = ""
+            addition = text
+
+        while len(message) + len(addition) > telegram_max_message_length:
+            size = telegram_max_message_length - len(message)
+            messages.append(message + addition[:size])
+            message = ""
+            addition = addition[size:]
+
+        message += addition
+        message_empty = False
+
+    if not message_empty:
+        messages.append(message)
+
+    return messages
+
+
+def split_email_digest(emails_to_send):
+    """
+    Raggruppa le email di un riepilogo per lo stesso destinatario in più email, ciascuna con un corpo di al massimo
+    `notification_digest_email_max_length` caratteri e al massimo `notification_digest_email_max_images` immagini
+    Restituisce per ciascuna email la lista dei corpi e il dizionario percorso dell'immagine -> Content-ID, così ogni
+    immagine viene allegata una sola volta per email
+    """
+    email_parts = []
+    bodies = []
+    content_ids = {}
+    length = 0
+
+    for _, body, image_path in emails_to_send:
+        new_image = bool(image_path) and image_path not in content_ids
+
+        if bodies and (length + len(body) > notification_digest_email_max_length or (new_image and len(content_ids) >= notification_digest_email_max_images)):
+            email_parts.append((bodies, content_ids))
+            bodies = []
+            content_ids = {}
+            length = 0
+
+        if image_path:
+            content_id = content_ids.setdefault(image_path, f"image{len(content_ids) + 1}")
+            body = body.replace("cid:image1", f"cid:{content_id}")
+
+        bodies.append(body)
+        length += len(body)
+
+    if bodies:
+        email_parts.append((bodies, content_ids))
+
+    return email_parts
+
+
+def send_notification_and_email(name, previous_price, current_price, stats=None, product=None):
+    """
+    Invia una notifica e una e-mail di aggiornamento del prezzo per un prodotto
+    Gli invii vengono accodati e consegnati in background dai thread delle notifiche
+    `stats` e `product` sono le copie delle statistiche dello storico (precedenti al nuovo prezzo) e dei dati del prodotto
+    prese dal chiamante insieme al prezzo precedente; se assenti vengono lette al momento
+    """
+    # Eseguita anche dai thread di monitoraggio: con una configurazione non valida la notifica viene solo saltata
+    try:
+        config = load_config()
+    except Exception as e:
+        logger.error(f"Notifica per '{name}' non inviata, errore nel caricamento del file di configurazione: {e}")
+        return
+    
+    if product is None:
+        product = products.get(name)
+
+        # Prodotto rimosso nel frattempo
+        if product is None:
+            return
+        
+    if stats is None:
+        stats = get_price_stats(name)
+
+    def send_email(subject, body, image_path, email_to_notify):
+        """
+        Accoda l'invio di un'email con l'oggetto e il corpo al destinatario, o la aggiunge al riepilogo se attivo
+        """
+        if not add_to_notification_digest("email", (subject, body, image_path), email_to_notify):
+            enqueue_notification({"kind": "email", "subject": subject, "body": body, "images": [["image1", image_path]] if image_path else [], "email_to_notify": email_to_notify})
+
+    def send_default_notification(subject, body, body_email, image_path):
+        """
+        Accoda l'invio di una email e di una notifica Telegram al desinatario di default, o li aggiunge al riepilogo se attivo
+        """
+        send_email(subject, body_email, image_path, config["receiver_email"])
+
+        if not add_to_notification_digest("telegram", body):
+            enqueue_notification({"kind": "telegram", "text": body})
+        
+    # Calcola statistiche sui prezzi dello storico del prodotto
+    average_price, price_minimum, price_maximum = calculate_statistics(stats, current_price)
+
+    # Calcolo del suggerimento per l'utente basato sui prezzi dello storico del prodotto
+    text_suggestion, _ = calculate_suggestion(stats, current_price, average_price, price_minimum, price_maximum)
+
+    image_path = product.get('image')
+
+    # Testi della notifica generati dai modelli precompilati
+    telegram_text, default_body_email, emails_to_send = render_notification_messages(
+        name, product['url'], previous_price, current_price, average_price, price_minimum, price_maximum, text_suggestion,
+        bool(image_path and os.path.isfile(image_path)), product["emails_and_thresholds"]
+    )
+
+    # Invio notifica telegram
+    if telegram_text is not None:
+        send_default_notification(notification_subject, telegram_text, default_body_email, image_path)
+
+    # Invio e-mail in caso di diminuizione del prezzo o diminuizione oltre la soglia
+    for email, subject_to_send, body_to_send in emails_to_send:
+        send_email(subject_to_send, body_to_send, image_path, email)
+
+
+def render_notification_messages(name, url, previous_price, current_price, average_price, price_minimum, price_maximum, text_suggestion, has_image, emails_and_thresholds):
+    """
+    Compone i testi di una notifica con i modelli precompilati di `notification_templates`: le sezioni comuni (dettagli,
+    collegamento, immagine) vengono generate una sola volta per evento e per ciascun destinatario con soglia viene inserita
+    solo la soglia. Restituisce il messaggio Telegram e l'email per il destinatario di default (None se il prezzo non è sceso)
+    e la lista (email, oggetto, corpo) delle email da inviare ai destinatari del prodotto
+    """
+    telegram_text = default_body_email = None
+    emails_to_send = []
+
+    # Sezioni comuni a tutti i destinatari, generate una sola volta per evento
+    price_dropped = current_price < previous_price
+    first_drop = average_price == price_minimum == price_maximum
+    html_details = notification_templates["html_details"](average_price, price_minimum, price_maximum, text_suggestion)
+    html_footer = notification_templates["html_footer"](url) + (notification_templates["html_image"]() if has_image else "")
+    body_email = (notification_templates["html_headline"](name, previous_price, current_price)
+                  + (notification_templates["html_details_first"]() if first_drop else html_details) + html_footer)
+    threshold_head = notification_templates["html_threshold_head"](name)
+    threshold_tail = notification_templates["html_threshold_tail"](current_price) + html_details + html_footer
+
+    if price_dropped:
+        telegram_text = (notification_templates["text_headline"](name, previous_price, current_price)
+                         + (notification_templates["text_details_first"]() if first_drop else notification_templates["text_details"](
+                             average_price, price_minimum, price_maximum, text_suggestion))
+                         + notification_templates["text_footer"](url))
+        default_body_email = body_email
+
+    # Controllo delle soglie: per ciascun destinatario viene completata solo la soglia, senza soglia si confronta il prezzo precedente
+    for email, threshold in emails_and_thresholds.items():
+        if threshold != 0.0:
+            if current_price < threshold:
+                emails_to_send.append((email, notification_threshold_subject, threshold_head + format(threshold) + threshold_tail))
+        elif price_dropped:
+            emails_to_send.append((email, notification_subject, body_email))
+
+    return telegram_text, default_body_email, emails_to_send
+
+
+def get_last_price(name):
+    """
+    Restituisce l'ultimo prezzo salvato per un determinato prodotto
+    Usa la voce più recente mantenuta nelle statistiche, senza caricare lo storico
+    """
+    stats = price_stats.get(name)
+
+    if name in prices and stats is not None and stats["entries"] > 0:
+        return stats["latest_price"]
     else:
         return None
     
 
-def get_price(url):
+def get_http_session():
     """
-    Estrae il prezzo di un prodotto da una pagina Amazon
+    Restituisce la sessione HTTP condivisa, creandola al primo utilizzo
+    La sessione mantiene le connessioni keep-alive in un pool limitato per host, condiviso tra tutti i thread
+    """
+    global http_session
+
+    with http_session_lock:
+        if http_session is None:
+            session = requests.Session()
+
+            # Header per emulare un browser, definiti una sola volta per tutte le richieste
+            session.headers.update(http_headers)
+
+            # Pool di connessioni: `pool_block` fa attendere le richieste oltre il limite per host invece di aprire nuove connessioni
+            adapter = HTTPAdapter(pool_connections=http_pool_hosts, pool_maxsize=http_pool_max_per_host, pool_block=True)
+            session.mount("https://", adapter)
+            session.mount("http://", adapter)
+
+            http_session = session
+
+    return http_session
+
+
+def http_get(url, **kwargs):
+    """
+    Esegue una richiesta GET tramite la sessione condivisa, applicando il timeout di default
+    """
+    kwargs.setdefault("timeout", http_timeout)
+
+    return get_http_session().get(url, **kwargs)
+
+
+def http_post(url, **kwargs):
+    """
+    Esegue una richiesta POST tramite la sessione condivisa, applicando il timeout di default
+    """
+    kwargs.setdefault("timeout", http_timeout)
+
+    return get_http_session().post(url, **kwargs)
+
+
+class RequestThrottledError(requests.RequestException):
+    """
+    Richiesta non inviata per il backoff dell'host o per il limite globale di richieste
+    `retry_at` indica quando riprovare, `backoff` se l'host è in backoff
+    """
+    def __init__(self, message, retry_at, backoff=False):
+        super().__init__(message)
+
+        self.retry_at = retry_at
+        self.backoff = backoff
+
+
+def acquire_request_slot(url, wait=True):
+    """
+    Riserva l'invio di una richiesta all'host dell'URL secondo il backoff dell'host e il limite globale di richieste (token bucket)
+    Con l'host in backoff solleva subito RequestThrottledError, senza attendere. Raggiunto il limite globale, con `wait` attende
+    nel thread chiamante, altrimenti solleva RequestThrottledError con il momento in cui riprovare (usato dai worker del pool
+    dei download, che non devono restare bloccati)
+    """
+    global rate_limit_tokens, rate_limit_updated
+
+    host = urlparse(url).netloc
+
+    while True:
+        with rate_limit_lock:
+            now = time.time()
+
+            # Backoff esponenziale dell'host dopo captcha o risposte 503
+            backoff_until = host_backoff.get(host, {}).get("until", 0)
+
+            if backoff_until > now:
+                raise RequestThrottledError(f"richieste a {host} sospese per altri {int(backoff_until - now)}s", backoff_until, backoff=True)
+
+            # Token bucket globale: al più `rate_limit_burst` richieste consecutive, poi `rate_limit_per_second`
+            rate_limit_tokens = min(rate_limit_burst, rate_limit_tokens + (now - rate_limit_updated) * rate_limit_per_second)
+            rate_limit_updated = now
+
+            if rate_limit_tokens >= 1:
+                rate_limit_tokens -= 1
+                return
+
+            # Ritardo casuale per evitare che le richieste rimandate ripartano nello stesso istante
+            wait_time = (1 - rate_limit_tokens) / rate_limit_per_second + random.uniform(0, rate_limit_jitter)
+
+        if not wait:
+            raise RequestThrottledError("limite globale di richieste raggiunto", now + wait_time)
+
+        time.sleep(wait_time)
+
+
+def register_host_response(url, blocked):
+    """
+    Aggiorna il backoff esponenziale dell'host in base all'esito della richiesta
+    """
+    host = urlparse(url).netloc
+
+    with rate_limit_lock:
+        if not blocked:
+            host_backoff.pop(host, None)
+            return
+
+        failures = host_backoff.get(host, {}).get("failures", 0) + 1
+        delay = min(host_backoff_base * 2 ** (failures - 1), host_backoff_max) * random.uniform(1, 1.5)
+
+        host_backoff[host] = {"failures": failures, "until": time.time() + delay}
+
+    logger.warning(f"Richieste a {host} bloccate (tentativo {failures}): nuove richieste sospese per {int(delay)}s")
+
+
+def is_blocked_response(response):
+    """
+    Verifica se Amazon ha risposto con un rifiuto (503/429) o con una pagina captcha al posto del prodotto
+    """
+    if response.status_code in (429, 503):
+        return True
+    
+    return response.status_code == 200 and any(marker in response.content for marker in captcha_markers)
+
+
+def parse_price_text(price_text):
+    """
+    Converte il testo di un prezzo in formato italiano (es. "1.299,99 €") in float, restituendo None se non valido
     """
-    # Definizione dell'header per emulare un browser
-    headers = {
-        "User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36",
-        "Accept-Language": "it-IT,it;q=0.9",
+    # Verifica validità del prezzo
+    price_is_valid = price_text_pattern.search(price_text)
+
+    if price_is_valid:
+        return float(price_is_valid.group(0).replace(".", "").replace(",", "."))
+    
+    return None
+
+
+def extract_product_page_fast(content):
+    """
+    Estrae titolo, prezzo e URL dell'immagine con espressioni regolari precompilate, senza costruire l'albero HTML
+    Restituisce None se uno degli elementi non viene trovato, lasciando il compito all'estrattore successivo
+    """
+    def element_text(raw_html):
+        """
+        Testo di un elemento HTML privato dei tag interni e delle entità
+        """
+        return html.unescape(html_tag_pattern.sub(b"", raw_html).decode("utf-8", errors="replace")).strip()
+
+    # Ricerca titolo del prodotto
+    title_match = product_title_pattern.search(content)
+
+    if title_match is None:
+        return None
+
+    # Il prezzo è il primo elemento `aok-offscreen` dopo il titolo: la ricerca si ferma appena lo trova
+    price_match = price_offscreen_pattern.search(content, title_match.end())
+
+    if price_match is None:
+        return None
+    
+    price = parse_price_text(element_text(price_match.group(1)))
+
+    if price is None:
+        return None
+
+    # Trova la prima immagine del prodotto
+    image_match = landing_image_pattern.search(content)
+    image_src_match = image_src_pattern.search(image_match.group(0)) if image_match else None
+
+    if image_src_match is None:
+        return None
+
+    return {
+        "title": element_text(title_match.group(1)),
+        "price": price,
+        "price_error": None,
+        "image_url": html.unescape(image_src_match.group(1).decode("utf-8", errors="replace"))
     }
 
-    try:
-        # Esecuzione richiesta HTTP
-        response = requests.get(url, headers=headers)
 
+def extract_product_page_soup(content):
+    """
+    Analizza il contenuto HTML di una pagina Amazon con BeautifulSoup ed estrae titolo, prezzo e URL della prima immagine del prodotto
+    Gli elementi non trovati valgono None e il motivo dell'assenza del prezzo è riportato in `price_error`
+    """
+    page = {"title": None, "price": None, "price_error": None, "image_url": None}
+
+    # Parsing del contenuto HTML della risposta
+    soup = BeautifulSoup(content, "html.parser")
+
+    # Trova la prima immagine del prodotto
+    image_element = soup.find("img", id="landingImage")
+
+    if image_element is not None:
+        page["image_url"] = image_element.get("src")
+
+    # Ricerca titolo del prodotto
+    title_element = soup.find("span", id="productTitle")
+
+    if title_element is None:
+        page["price_error"] = "Titolo del prodotto non trovato"
+        return page
+    
+    page["title"] = title_element.get_text().strip()
+
+    title_container = title_element.find_parent()
+
+    # Trova il prezzo del prodotto sotto al titolo
+    price_element = title_container.find_next("span", class_="aok-offscreen")
+
+    if price_element is None:
+        page["price_error"] = "Elemento prezzo non trovato sotto il titolo"
+        return page
+    
+    # Estrae e pulisce il testo del prezzo
+    page["price"] = parse_price_text(price_element.get_text().strip())
+
+    if page["price"] is None:
+        page["price_error"] = "Prezzo non trovato nel testo"
+
+    return page
+
+
+def parse_product_page(content):
+    """
+    Estrae titolo, prezzo e URL dell'immagine provando in ordine gli estrattori di `page_extractors`
+    L'analisi completa con BeautifulSoup viene eseguita solo se gli estrattori più veloci non trovano tutti gli elementi
+    """
+    page = None
+
+    for extractor in page_extractors:
+        page = extractor(content)
+
+        if page is not None and page["price"] is not None and page["image_url"] is not None:
+            return page
+
+    return page
+
+
+def get_product_page(url, max_age=0, wait=True):
+    """
+    Scarica e analizza una sola volta la pagina di un prodotto Amazon, restituendo titolo, prezzo e URL dell'immagine
+    Se la stessa pagina è stata analizzata da meno di `max_age` secondi viene riutilizzata senza scaricarla di nuovo
+    La richiesta è condizionale (ETag/Last-Modified) e l'analisi viene saltata se la pagina non è cambiata
+    Con `wait` False la richiesta non attende il limite globale di richieste (vedi `acquire_request_slot`)
+    """
+    with page_cache_lock:
+        cached_page = page_cache.get(url)
+
+    if cached_page is not None and time.time() - cached_page["fetched_at"] <= max_age:
+        return cached_page
+
+    # Validatori della precedente risposta per chiedere la pagina solo se modificata
+    headers = {}
+
+    if cached_page is not None:
+        if cached_page["etag"]:
+            headers["If-None-Match"] = cached_page["etag"]
+
+        if cached_page["last_modified"]:
+            headers["If-Modified-Since"] = cached_page["last_modified"]
+
+    # Turno della richiesta secondo il limite globale e il backoff dell'host
+    acquire_request_slot(url, wait)
+
+    # Esecuzione richiesta HTTP
+    response = http_get(url, headers=headers)
+
+    # Captcha o rifiuto: la pagina non viene analizzata e l'host entra in backoff
+    blocked = is_blocked_response(response)
+    register_host_response(url, blocked)
+
+    if blocked:
+        raise requests.HTTPError(f"Richiesta bloccata da Amazon (captcha o stato {response.status_code})", response=response)
+
+    if response.status_code == 304 and cached_page is not None:
+        # Pagina non modificata: vale l'analisi precedente
+        page = dict(cached_page)
+    else:
         # Verifica errori nella risposta
         response.raise_for_status()
 
-        # Parsing del contenuto HTML della risposta
-        soup = BeautifulSoup(response.content, "html.parser")
+        content_hash = hashlib.sha256(response.content).hexdigest()
 
-        # Ricerca titolo del prodotto
-        title_element = soup.find("span", id="productTitle")
+        # Contenuto identico al precedente download: l'analisi viene riutilizzata
+        if cached_page is not None and cached_page["content_hash"] == content_hash:
+            page = dict(cached_page)
+        else:
+            page = parse_product_page(response.content)
+            page["content_hash"] = content_hash
 
-        if title_element is None:
-            raise ValueError("Titolo del prodotto non trovato")
-        
-        title_container = title_element.find_parent()
+        page["etag"] = response.headers.get("ETag")
+        page["last_modified"] = response.headers.get("Last-Modified")
 
-        # Trova il prezzo del prodotto sotto al titolo
-        price_element = title_container.find_next("span", class_="aok-offscreen")
+    page["fetched_at"] = time.time()
 
-        if price_element is None:
-            raise ValueError("Elemento prezzo non trovato sotto il titolo")
-        
-        # Estrae e pulisce il testo del prezzo
-        price_text = price_element.get_text().strip()
+    # Memorizza la pagina analizzata per i successivi utilizzi (es. immagine subito dopo il prezzo)
+    with page_cache_lock:
+        page_cache[url] = page
 
-        # Verifica validità del prezzo
-        price_is_valid = re.search(r"\d{1,3}(?:\.\d{3})*(?:,\d{2})?", price_text)
+    return page
 
-        if price_is_valid:
-            price_value = price_is_valid.group(0).replace(".", "").replace(",", ".")
 
-            return float(price_value)
-        else:
-            raise ValueError("Prezzo non trovato nel testo")
+def get_price(url, max_age=0, wait=True):
+    """
+    Estrae il prezzo di un prodotto da una pagina Amazon
+    Con `wait` False la richiesta rimandata dal limite di richieste o dal backoff dell'host solleva RequestThrottledError,
+    lasciando al chiamante la ripianificazione
+    """
+    try:
+        page = get_product_page(url, max_age, wait)
+
+        if page["price"] is None:
+            raise ValueError(page["price_error"])
+
+        return page["price"]
+    except RequestThrottledError as e:
+        if not wait:
+            raise
+
+        logger.warning(f"Prezzo non aggiornato, richiesta non inviata: {e}")
+        return None
     except requests.RequestException as e:
         logger.error(f"Errore nella richiesta HTTP di get_price: {e}")
         return None
@@ -634,32 +2405,43 @@ def get_price(url):
         return None
 
 
-def get_image(name):
+def get_fetched_price(future, url, max_age=0):
     """
-    Estrae il prezzo e la prima immagine di un prodotto da una pagina Amazon
+    Restituisce il prezzo scaricato dal pool dei download
+    Se la richiesta è stata rimandata dal limite globale, l'attesa avviene nel thread chiamante e la richiesta viene ripetuta;
+    con l'host in backoff solleva RequestThrottledError senza attendere
     """
-    # Definizione dell'header per emulare un browser
-    headers = {
-        "User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36",
-        "Accept-Language": "it-IT,it;q=0.9",
-    }
+    while True:
+        try:
+            return future.result()
+        except RequestThrottledError as e:
+            if e.backoff:
+                raise
+
+            time.sleep(max(0, e.retry_at - time.time()))
+
+            future = fetch_executor.submit(get_price, url, max_age, False)
+
+
+def get_image(name, max_age=None, wait=True):
+    """
+    Estrae la prima immagine di un prodotto da una pagina Amazon
+    Di default riutilizza la pagina se analizzata di recente (es. dal controllo del prezzo appena eseguito)
+    Con `wait` False una richiesta rimandata non attende il limite globale e mantiene l'immagine attuale
+    """
+    if max_age is None:
+        max_age = page_cache_ttl
 
     try:
-        # Esecuzione richiesta HTTP
-        response = requests.get(products[name]['url'], headers=headers)
-        response.raise_for_status()
+        page = get_product_page(products[name]['url'], max_age, wait)
 
-        # Parsing del contenuto HTML della risposta
-        soup = BeautifulSoup(response.content, "html.parser")
+        image_url = page["image_url"]
 
-        # Trova la prima immagine del prodotto
-        image_element = soup.find("img", id="landingImage")
-        if image_element is None:
+        if image_url is None:
             raise ValueError(f"Immagine di {name} non trovata")
-        image_url = image_element['src']
 
         # Scarica l'immagine
-        image_response = requests.get(image_url)
+        image_response = http_get(image_url)
         image_response.raise_for_status()
 
         # Crea la directory se non esiste
@@ -673,88 +2455,196 @@ def get_image(name):
 
         return image_path
 
-    except requests.RequestException as e:
-        logger.error(f"Errore nella richiesta HTTP di get_image per il prodotto {name}: {e}")
-        return products[name]['image'] if products[name]['image'] else None
+    except requests.RequestException as e:
+        logger.error(f"Errore nella richiesta HTTP di get_image per il prodotto {name}: {e}")
+        return products[name]['image'] if products[name]['image'] else None
+    except Exception as e:
+        logger.error(f"Errore in get_image per il prodotto {name}: {e}")
+        return products[name]['image'] if products[name]['image'] else None
+
+
+def check_price_and_notify(name, url):
+    """
+    Controlla il prezzo attuale e invia notifiche in caso di ribasso del prezzo
+    La richiesta HTTP avviene fuori dal lock e la notifica dopo il suo rilascio: solo la lettura del prezzo precedente,
+    l'aggiornamento dello stato e il salvataggio sono serializzati
+    """
+    # Recupera il prezzo attuale tramite il pool di download (al più `max_concurrent_fetches` richieste in parallelo)
+    # Una richiesta rimandata solleva RequestThrottledError, gestita dallo scheduler con la ripianificazione del controllo
+    current_price = fetch_executor.submit(get_price, url, 0, False).result()
+
+    if current_price is None:
+        logger.warning(f"Non trovato il prezzo di {name} sulla pagina {url}")
+        return
+    
+    # Lettura del prezzo precedente e salvataggio del nuovo in un'unica sezione critica, così due controlli concorrenti
+    # dello stesso prodotto non si confrontano con lo stesso prezzo precedente (i thread aspetteranno il loro turno)
+    with check_price_lock:
+        # Il prodotto potrebbe essere stato rimosso durante la richiesta
+        if name not in products:
+            logger.info(f"Prodotto '{name}' rimosso durante il controllo del prezzo")
+            return
+        
+        notify = products[name]["notify"]
+
+        # Verifica se le notifiche del prodotto sono attivate
+        if notify:
+            # Recupera l'ultimo prezzo memorizzato del prodotto
+            previous_price = get_last_price(name)
+
+            if previous_price is None:
+                logger.warning(f"Non trovato il prezzo di {name} nelle liste")
+                return
+            
+            # Copie per la notifica inviata dopo il rilascio del lock (statistiche precedenti al nuovo prezzo)
+            product = dict(products[name])
+            stats = dict(get_price_stats(name))
+
+        # Aggiornamento del prodotto
+        products[name]["price"] = current_price
+        index_product(name)
+
+        save_price(name, products[name]["price"])
+        save_products()
+
+    if notify:
+        send_notification_and_email(name, previous_price, current_price, stats, product)
+
+
+def calculate_effective_timer_refresh(name):
+    """
+    Calcola l'intervallo di aggiornamento effettivo di un prodotto
+    In modalità adattiva l'intervallo si riduce verso il limite minimo quanto più spesso il prezzo è cambiato
+    negli ultimi `adaptive_timer_window` controlli, e cresce verso il limite massimo se il prezzo è stabile
+    I prezzi recenti vengono letti dalle statistiche, senza caricare lo storico (la funzione è chiamata con `tracking_condition` acquisita)
+    """
+    product = products[name]
+
+    if not product.get("adaptive_timer"):
+        return product["timer_refresh"]
+    
+    timer_minimum, timer_maximum = sorted((product.get("timer_refresh_min", adaptive_timer_min_default), product.get("timer_refresh_max", adaptive_timer_max_default)))
+
+    recent_prices = [price for price in list(get_price_stats(name)["recent_prices"])[-adaptive_timer_window:] if price is not None]
+
+    # Storico insufficiente: si usa il timer impostato, nei limiti indicati
+    if len(recent_prices) < 2:
+        return min(max(product["timer_refresh"], timer_minimum), timer_maximum)
+
+    # Frazione dei controlli in cui il prezzo è cambiato (0: stabile, 1: cambia ad ogni controllo)
+    price_changes = sum(1 for previous, current in zip(recent_prices, recent_prices[1:]) if previous != current)
+    volatility = price_changes / (len(recent_prices) - 1)
+
+    return int(round(timer_maximum - (timer_maximum - timer_minimum) * volatility))
+
+
+def schedule_tracking(name, url, generation, delay=0, deadline=None):
+    """
+    Inserisce il prossimo controllo del prodotto nella coda a priorità dello scheduler, con scadenza `timer + timer_effective`
+    L'eventuale `delay` sposta in avanti la scadenza per scaglionare gli avvii, mentre `deadline` la fissa
+    (es. alla fine del backoff dell'host)
+    Deve essere chiamata con `tracking_condition` acquisita (e senza `check_price_lock`, acquisito qui dopo di essa)
+    """
+    # Stesso lock dello scrittore in background, che serializza i prodotti mentre lo scheduler ne aggiorna la scadenza
+    with check_price_lock:
+        products[name]["timer_effective"] = calculate_effective_timer_refresh(name)
+        products[name]["timer"] = time.time() + delay if deadline is None else deadline - products[name]["timer_effective"]
+
+    heapq.heappush(tracking_heap, (products[name]["timer"] + products[name]["timer_effective"], generation, name, url))
+
+    # La nuova scadenza cambia la posizione del prodotto nell'ordinamento per "Timer"
+    index_product(name)
+
+    # Risveglia lo scheduler qual'ora la nuova scadenza fosse la più vicina
+    tracking_condition.notify()
+
+
+def run_tracking_check(name, url, generation):
+    """
+    Esegue il controllo del prezzo di un prodotto scaduto e ne pianifica il successivo
+    Un controllo rimandato dal backoff dell'host o dal limite di richieste viene ripianificato per quando la richiesta è consentita
+    """
+    retry_at = None
+
+    try:
+        check_price_and_notify(name, url)
+
+        # Resetta i filtri al seguito dell'aggiornamento del prezzo
+        reset_filters()
+    except RequestThrottledError as e:
+        retry_at = e.retry_at
+
+        logger.info(f"Controllo di '{name}' rimandato: {e}")
     except Exception as e:
-        logger.error(f"Errore in get_image per il prodotto {name}: {e}")
-        return products[name]['image'] if products[name]['image'] else None
+        logger.error(f"Errore durante il monitoraggio di '{name}': {e}")
+    finally:
+        with tracking_condition:
+            # Ripianifica solo se il monitoraggio non è stato fermato o riavviato nel frattempo
+            if tracking_generations.get(name) == generation and name in products:
+                schedule_tracking(name, url, generation, deadline=retry_at)
 
 
-def start_tracking(name, url):
+def run_tracking_scheduler():
     """
-    Avvia o riavvia il monitoraggio del prezzo di un prodotto
+    Ciclo dello scheduler unico: attende la scadenza più vicina e affida i prodotti scaduti al pool dei worker
     """
-    def track_loop(name, url):
-        """
-        Ciclo di monitoraggio del prezzo del prodotto
-        """
-        def check_price_and_notify(name, url):
-            """
-            Controlla il prezzo attuale e invia notifiche in caso di ribasso del prezzo
-            """
-            # Ottenere il lock in modalità bloccante (i thread aspetteranno il loro turno)
-            with check_price_lock:
-                print(threads[name])
-                # Recupera il prezzo attuale
-                current_price = get_price(url)
+    while True:
+        with tracking_condition:
+            while True:
+                # Scarta le voci di prodotti fermati o riavviati (cancellazione pigra)
+                while tracking_heap and tracking_generations.get(tracking_heap[0][2]) != tracking_heap[0][1]:
+                    heapq.heappop(tracking_heap)
+
+                if not tracking_heap:
+                    tracking_condition.wait()
+                    continue
 
-                if current_price is None:
-                    logger.warning(f"Non trovato il prezzo di {name} sulla pagina {url}")
-                    return
-                
-                # Verifica se le notifiche del prodotto sono attivate
-                if products[name]["notify"]:
-                    # Recupera l'ultimo prezzo memorizzato del prodotto
-                    previous_price = get_last_price(name)
-                    
-                    if previous_price is None:
-                        logger.warning(f"Non trovato il prezzo di {name} nelle liste")
-                        return
-                    
-                    send_notification_and_email(name, previous_price, current_price)
+                delay = tracking_heap[0][0] - time.time()
 
-                # Aggiornamento del prodotto
-                products[name]["price"] = current_price
+                if delay <= 0:
+                    _, generation, name, url = heapq.heappop(tracking_heap)
+                    break
 
-                save_price(name, products[name]["price"])
-                save_products()
+                tracking_condition.wait(delay)
 
-        # Ripeti il loop finchè l'evento non viene settato
-        while not stop_events[name].is_set():
-            products[name]["timer"] = time.time()
+        tracking_executor.submit(run_tracking_check, name, url, generation)
 
-            # Aspetta il timer e verifica la condizione di uscita del loop
-            if stop_events[name].wait(products[name]["timer_refresh"]):
-                break  
 
-            check_price_and_notify(name, url)
+def start_tracking(name, url):
+    """
+    Avvia o riavvia il monitoraggio del prezzo di un prodotto
+    """
+    global tracking_scheduler_thread
 
-            # Resetta i filtri al seguito dell'aggiornamento del prezzo
-            reset_filters()
+    with tracking_condition:
+        # Un eventuale monitoraggio già attivo viene sostituito: la sua voce nella coda diventa obsoleta
+        if name in tracking_generations:
+            logger.info(f"Fermando il monitoraggio precedente di '{name}'...")
 
-        # Rimuove l'evento di stop del thread al termine del loop
-        del stop_events[name]
+        generation = next(tracking_generation_counter)
+        tracking_generations[name] = generation
 
-        logger.info(f"Monitoraggio di '{name}' fermato")
+        # Ritardo casuale per evitare che i prodotti riavviati insieme vengano controllati nello stesso istante
+        schedule_tracking(name, url, generation, random.uniform(0, tracking_start_jitter))
 
-    global threads, stop_events
+        # Avvio dello scheduler al primo prodotto monitorato
+        if tracking_scheduler_thread is None:
+            tracking_scheduler_thread = threading.Thread(target=run_tracking_scheduler, daemon=True)
+            tracking_scheduler_thread.start()
 
-    # Ferma un eventuale monitoraggio del prodotto qual'ora fosse già attivo
-    if name in threads and threads[name].is_alive():
-        logger.info(f"Fermando il monitoraggio precedente di '{name}'...")
+    logger.info(f"Avviato il monitoraggio per '{name}' ({url}) con un nuovo timer")
 
-        stop_events[name].set() # Segnala al thread corrente di fermarsi
-        threads[name].join(timeout=1) # Aspetta che il thread corrente termini
 
-    # Crea il thread di monitoraggio e il suo evento di stop
-    threads[name] = threading.Thread(target=track_loop, args=(name, url,), daemon=True,)
-    stop_events[name] = threading.Event()
-    
-    # Avvio del monitoraggio del prodotto
-    threads[name].start()
+def stop_tracking(name):
+    """
+    Blocco del monitoraggio del prodotto rimuovendolo dallo scheduler
+    Un controllo già in corso viene completato ma non più ripianificato
+    """
+    with tracking_condition:
+        if tracking_generations.pop(name, None) is not None:
+            tracking_condition.notify()
 
-    logger.info(f"Avviato il monitoraggio per '{name}' ({url}) con un nuovo timer")
+            logger.info(f"Monitoraggio di '{name}' fermato")
 
 
 def block_root():
@@ -785,6 +2675,17 @@ def unlock_root():
     root.attributes("-disabled", False)
 
 
+def show_request_throttled_warning(name, error, action):
+    """
+    Avvisa che la pagina del prodotto non è stata richiesta per il limite di richieste o per il backoff dell'host,
+    indicando tra quanto riprovare
+    """
+    retry_in = max(1, math.ceil(error.retry_at - time.time()))
+
+    logger.warning(f"Prodotto '{name}' non {action}, richiesta non inviata: {error}")
+    messagebox.showwarning("Attenzione", f"Amazon sta limitando le richieste: il prodotto non è stato {action}.\nRiprova tra {retry_in} secondi")
+
+
 def open_advanced_dialog(parent_dialog):
     """
     Apre il dialogo avanzato per aggiungere soglie di notifica via email e modifica del timer di aggiornamento
@@ -1023,6 +2924,18 @@ def open_advanced_dialog(parent_dialog):
             timer_entry.delete(0, "end")
             timer_entry.insert(0, "1800")
 
+    def on_adaptive_timer_bounds_change(*args):
+        """
+        Gestione del cambiamento dei limiti del timer adattivo
+        """
+        global timer_refresh_min, timer_refresh_max
+
+        min_value = timer_min_entry.get()
+        max_value = timer_max_entry.get()
+
+        timer_refresh_min = int(min_value) if min_value.isdigit() and int(min_value) > 0 else adaptive_timer_min_default
+        timer_refresh_max = int(max_value) if max_value.isdigit() and int(max_value) > 0 else adaptive_timer_max_default
+
     def update_email_and_threshold_tree():
         """
         Aggiorna la tabella che mostra le e-mail e le soglie
@@ -1104,6 +3017,26 @@ def open_advanced_dialog(parent_dialog):
     timer_entry.grid(row=5, column=1, padx=10, pady=10, sticky="w")
     timer_entry.insert(0, timer_refresh)
 
+    # Timer adattivo e relativi limiti
+    ttk.Label(container, text="Timer adattivo:").grid(row=6, column=0, padx=10, pady=10, sticky="we")
+
+    adaptive_timer_frame = ttk.Frame(container)
+    adaptive_timer_frame.grid(row=6, column=1, padx=10, pady=10, sticky="w")
+
+    ttk.Checkbutton(adaptive_timer_frame, variable=adaptive_timer).pack(side="left")
+
+    ttk.Label(adaptive_timer_frame, text="Min [s]:").pack(side="left", padx=(10, 5))
+    timer_min_entry = ttk.Entry(adaptive_timer_frame, width=8, font=("Arial", 10), validate="key", validatecommand=(root.register(is_valid_timer), "%P"))
+    timer_min_entry.pack(side="left")
+    timer_min_entry.insert(0, timer_refresh_min)
+
+    ttk.Label(adaptive_timer_frame, text="Max [s]:").pack(side="left", padx=(10, 5))
+    timer_max_entry = ttk.Entry(adaptive_timer_frame, width=8, font=("Arial", 10), validate="key", validatecommand=(root.register(is_valid_timer), "%P"))
+    timer_max_entry.pack(side="left")
+    timer_max_entry.insert(0, timer_refresh_max)
+
+    ttk.Label(adaptive_timer_frame, text="Aggiorna più spesso i prodotti il cui prezzo cambia di frequente", font=("Arial", 8, "italic")).pack(side="left", padx=(10, 0))
+
     # Menu tasto destro        
     email_threshold_menu = tk.Menu(advanced_dialog, tearoff=0)
     email_threshold_menu.add_command(label="Modifica Soglia", command=modify_threshold)
@@ -1125,6 +3058,12 @@ def open_advanced_dialog(parent_dialog):
     timer_entry.bind("<KeyRelease>", on_timer_change)
     timer_entry.bind("<Button-3>", lambda e: show_text_menu(e, timer_entry))
 
+    timer_min_entry.bind("<KeyRelease>", on_adaptive_timer_bounds_change)
+    timer_min_entry.bind("<Button-3>", lambda e: show_text_menu(e, timer_min_entry))
+
+    timer_max_entry.bind("<KeyRelease>", on_adaptive_timer_bounds_change)
+    timer_max_entry.bind("<Button-3>", lambda e: show_text_menu(e, timer_max_entry))
+
     # Mostra eventuali e-mail e relative soglie nella tabella
     update_email_and_threshold_tree()
 
@@ -1219,8 +3158,14 @@ def open_add_product_dialog():
         # Blocco della Root durante l'aggiunta del prodotto
         block_root()
 
-        # Ricerca prezzo
-        current_price = get_price(url)
+        # Ricerca prezzo senza attendere il limite di richieste nel thread dell'interfaccia
+        # Una richiesta rimandata non è un URL errato: il prodotto non viene aggiunto e si chiede di riprovare
+        try:
+            current_price = get_price(url, 0, False)
+        except RequestThrottledError as e:
+            unlock_root()
+            show_request_throttled_warning(name, e, "aggiunto")
+            return False
 
         if current_price is None:
             current_price = "aggiorna o verifica l'URL: - "
@@ -1250,18 +3195,26 @@ def open_add_product_dialog():
 
         # Crea il nuovo prodotto da aggiungere alla lista
         now = datetime.datetime.now().strftime("%Y-%m-%d %H:%M:%S")
-        products[name] = {
-            "url": url,
-            "price": current_price,
-            "notify": notify.get(),
-            "timer": time.time(),
-            "timer_refresh": timer_refresh,
-            "date_added": now,
-            "date_edited": now,
-            "emails_and_thresholds": emails_and_thresholds,
-            "image": ""
-        }
-        products[name]['image'] = get_image(name)
+
+        # Inserimento con il lock usato dallo scrittore in background durante il salvataggio dei prodotti
+        with check_price_lock:
+            products[name] = {
+                "url": url,
+                "price": current_price,
+                "notify": notify.get(),
+                "timer": time.time(),
+                "timer_refresh": timer_refresh,
+                "adaptive_timer": adaptive_timer.get(),
+                "timer_refresh_min": timer_refresh_min,
+                "timer_refresh_max": timer_refresh_max,
+                "date_added": now,
+                "date_edited": now,
+                "emails_and_thresholds": emails_and_thresholds,
+                "image": ""
+            }
+
+        products[name]['image'] = get_image(name, wait=False)
+        index_product(name)
 
         save_products()
         save_price(name, products[name]["price"])
@@ -1278,12 +3231,15 @@ def open_add_product_dialog():
         root.focus_force()  # Forza il focus sulla finestra principale
         add_product_dialog.destroy()
 
-    global emails_and_thresholds, timer_refresh, notify
+    global emails_and_thresholds, timer_refresh, notify, adaptive_timer, timer_refresh_min, timer_refresh_max
 
     # Inizializza i dati del nuovo prodotto
     emails_and_thresholds = {}
     timer_refresh = 1800
     notify = tk.BooleanVar(value=True)
+    adaptive_timer = tk.BooleanVar(value=False)
+    timer_refresh_min = adaptive_timer_min_default
+    timer_refresh_max = adaptive_timer_max_default
 
     # Configurazione del dialogo per l'aggiunta del prodotto
     add_product_dialog = tk.Toplevel(root)
@@ -1369,9 +3325,9 @@ def show_product_details(event=None):
             if name not in prices:
                 raise ValueError(f"Prodotto '{name}' non trovato in prices")
             
-            # Creazione del DataFrame dai dati dei prezzi del prodotto
-            df = pd.DataFrame(prices[name])
-            df["date"] = pd.to_datetime(df["date"])
+            # Creazione del DataFrame direttamente dagli array dello storico colonnare
+            history = prices[name]
+            df = pd.DataFrame({"date": pd.to_datetime(history.timestamps.tolist(), unit="s"), "price": history.prices.tolist()})
             prices_graph = go.Figure()
 
             # Regola per la visualizzazione dei dettagli al passaggio del mouse
@@ -1454,7 +3410,7 @@ def show_product_details(event=None):
         if show_info:
             messagebox.showinfo("Copia negli appunti", "URL copiato negli appunti!")
 
-    selected_products = products_tree.selection()
+    selected_products = get_selected_products()
 
     if not selected_products:
         logger.warning("Nessun prodotto selezionato per visualizzare i dettagli")
@@ -1471,12 +3427,11 @@ def show_product_details(event=None):
     current_price = products[name]["price"]
 
     # Calcola statistiche sui prezzi dello storico del prodotto
-    historical_prices = prices.get(name, [])
-    all_prices = [entry["price"] for entry in historical_prices if isinstance(entry["price"], (int, float))]
-    average_price, price_minimum, price_maximum = calculate_statistics(all_prices, current_price)
+    stats = get_price_stats(name)
+    average_price, price_minimum, price_maximum = calculate_statistics(stats, current_price)
 
     # Calcolo del suggerimento per l'utente basato sui prezzi dello storico del prodotto
-    text_suggestion, color_suggestion = calculate_suggestion(all_prices, current_price, average_price, price_minimum, price_maximum)
+    text_suggestion, color_suggestion = calculate_suggestion(stats, current_price, average_price, price_minimum, price_maximum)
     
     # Creazione della finestra di dialogo con i dettagli del prodotto
     details_dialog = tk.Toplevel(root)
@@ -1601,19 +3556,21 @@ def open_edit_product_dialog():
         # Blocco della Root durante la modifica del prodotto
         block_root()
 
-        # Ricerca prezzo aggiornato
-        new_price = get_price(new_url)
+        # Ricerca prezzo aggiornato senza attendere il limite di richieste nel thread dell'interfaccia
+        # Una richiesta rimandata non è un URL errato: il prodotto resta invariato e si chiede di riprovare
+        try:
+            new_price = get_price(new_url, 0, False)
+        except RequestThrottledError as e:
+            unlock_root()
+            show_request_throttled_warning(name, e, "modificato")
+            return False
 
-        # Aggiorna le informazioni del prodotto
+        # Verifica del prezzo trovato
         if new_price is None:
-            products[name]["price"] = "Aggiorna o verifica l'URL: - "
-
             messagebox.showwarning("Attenzione", "Non è stato trovato il prezzo sulla pagina!\nAggiorna o verifica l'URL")
 
-            logger.warning(f"Sul prodotto {name} non è stato trovato il prezzo sulla pagina " + products[name]["url"])
+            logger.warning(f"Sul prodotto {name} non è stato trovato il prezzo sulla pagina " + new_url)
         else:
-            products[name]["price"] = new_price
-
             # Verifica se una delle sogle impostate è più alta del nuovo prezzo
             for threshold in emails_and_thresholds.values():
                 if threshold > new_price:
@@ -1635,13 +3592,23 @@ def open_edit_product_dialog():
                     # E' inutile controllare altro se non importa che una delle soglie sia più alta del prezzo corrente
                     break
 
-        products[name]["url"] = new_url
-        products[name]["notify"] = notify.get()
-        products[name]["timer"] = time.time()
-        products[name]["timer_refresh"] = timer_refresh
-        products[name]["date_edited"] = datetime.datetime.now().strftime("%Y-%m-%d %H:%M:%S")
-        products[name]["emails_and_thresholds"] = emails_and_thresholds
-        products[name]["image"] = get_image(name)
+        # Aggiorna le informazioni del prodotto con il lock usato dallo scrittore in background durante il salvataggio dei prodotti
+        # (i prodotti meno recenti ricevono qui le chiavi del timer adattivo)
+        with check_price_lock:
+            products[name]["price"] = new_price if new_price is not None else "Aggiorna o verifica l'URL: - "
+            products[name]["url"] = new_url
+            products[name]["notify"] = notify.get()
+            products[name]["timer"] = time.time()
+            products[name]["timer_refresh"] = timer_refresh
+            products[name]["adaptive_timer"] = adaptive_timer.get()
+            products[name]["timer_refresh_min"] = timer_refresh_min
+            products[name]["timer_refresh_max"] = timer_refresh_max
+            products[name]["date_edited"] = datetime.datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+            products[name]["emails_and_thresholds"] = emails_and_thresholds
+
+        # L'immagine viene scaricata fuori dal lock: la chiave esiste già e viene solo sostituita
+        products[name]["image"] = get_image(name, wait=False)
+        index_product(name)
 
         save_products()
         save_price(name, products[name]["price"])
@@ -1658,17 +3625,18 @@ def open_edit_product_dialog():
         root.focus_force()  # Forza il focus sulla finestra principale
         edit_product_dialog.destroy()
 
-    global emails_and_thresholds, timer_refresh, notify
-
-    selected_products = products_tree.selection()[0]
+    global emails_and_thresholds, timer_refresh, notify, adaptive_timer, timer_refresh_min, timer_refresh_max
 
-    selected_name = products_tree.item(selected_products)["values"][0]
+    selected_name = get_selected_products()[0]
     
     # Carica i dati del prodotto selezionato
     selected_url = products[selected_name]["url"]
     emails_and_thresholds = products[selected_name]["emails_and_thresholds"]
     timer_refresh = products[selected_name]["timer_refresh"]
     notify = tk.BooleanVar(value=products[selected_name]["notify"])
+    adaptive_timer = tk.BooleanVar(value=products[selected_name].get("adaptive_timer", False))
+    timer_refresh_min = products[selected_name].get("timer_refresh_min", adaptive_timer_min_default)
+    timer_refresh_max = products[selected_name].get("timer_refresh_max", adaptive_timer_max_default)
 
     # Configurazione del dialogo per la modifica del prodotto
     edit_product_dialog = tk.Toplevel(root)
@@ -1724,20 +3692,9 @@ def remove_products():
     """
     Rimozione dei prodotti selezionati dalla lista
     """
-    def stop_tracking(name):
-        """
-        Blocco del monitoraggio del prodotto fermando il relativo thread
-        """
-        if name in stop_events:
-            stop_events[name].set() # Segnala al thread corrente di fermarsi
-
-        if name in threads:
-            threads[name].join(timeout=1) # Aspetta che il thread corrente termini
-            del threads[name]
-
-    global stop_events, threads, hovered_row_products_tree
+    global hovered_row_products_tree
 
-    selected_products = products_tree.selection()
+    selected_products = get_selected_products()
 
     if not selected_products:
         logger.warning("Seleziona un prodotto dalla lista per rimuoverlo")
@@ -1766,8 +3723,12 @@ def remove_products():
             # Ferma il monitoraggio del prodotto
             stop_tracking(name)
             
-            # Rimozione prodotto
-            del products[name]
+            # Rimozione prodotto (con il lock usato dallo scrittore in background durante il salvataggio dei prodotti)
+            with check_price_lock:
+                del products[name]
+
+            unindex_product(name)
+            products_selection.discard(name)
 
             hovered_row_products_tree = None
 
@@ -1799,45 +3760,74 @@ def open_progress_dialog(update_all_prices=None, update_all_images=None):
 
             updated_products = []
 
-            # Ciclo sui prodotti selezionati per aggiornarne i prezzi
-            for product_index, name in enumerate(products_to_update):
-                # Ricerca prezzo aggiornato
-                current_price = get_price(products[name]["url"])
-                
-                # Aggiornamento della barra di progresso
-                loading_dialog.progress_bar["value"] = product_index + 1
-                loading_dialog.progress_label.config(text=f"Aggiornamento prezzo di {product_index + 1}/{max_value}...")
-                loading_dialog.update_idletasks()
-
-                # Gestione del caso in cui il prezzo non può essere aggiornato passando al prossimo prodotto da aggiornare
-                if current_price is None:
-                    logger.warning(f"Prodotto '{name}' non aggiornato: non trovato il prezzo sulla pagina {products[name]['url']}")
-                    
-                    products[name]["price"] = "aggiorna o verifica l'URL: - "
-                    products[name]["timer"] = time.time()
-                    products[name]["date_edited"] = datetime.datetime.now().strftime("%Y-%m-%d %H:%M:%S")
-
-                    continue
-                
-                # Aggiornamento del prodotto
-                products[name]["price"] = current_price
-                products[name]["timer"] = time.time()
-                products[name]["date_edited"] = datetime.datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+            # Download in parallelo delle pagine dei prodotti (riutilizzando quelle analizzate di recente), letti nello stesso ordine dei prodotti
+            # Le richieste rimandate dal limite globale vengono ripetute da questo thread, senza bloccare i worker del pool
+            names_to_update = list(products_to_update)
+            fetched_prices = [(products[name]["url"], fetch_executor.submit(get_price, products[name]["url"], page_cache_ttl, False)) for name in names_to_update]
 
-                # Recupera l'ultimo prezzo memorizzato del prodotto
-                previous_price = get_last_price(name)
+            # Le notifiche dei prodotti aggiornati vengono raccolte in un unico riepilogo, inviato al termine del ciclo
+            start_notification_digest()
 
-                # Aggiunta dei prodotti aggiornati alla lista per il report finale e notifica di un eventuale ribasso
-                if previous_price is not None:
-                    updated_products.append((name, previous_price, current_price))
+            try:
+                # Ciclo sui prodotti selezionati per aggiornarne i prezzi
+                for product_index, (name, (url, fetched_price)) in enumerate(zip(names_to_update, fetched_prices)):
+                    # Aggiornamento della barra di progresso
+                    loading_dialog.progress_bar["value"] = product_index + 1
+                    loading_dialog.progress_label.config(text=f"Aggiornamento prezzo di {product_index + 1}/{max_value}...")
+                    loading_dialog.update_idletasks()
+
+                    # Con l'host in backoff il prodotto viene saltato mantenendo il prezzo attuale
+                    try:
+                        current_price = get_fetched_price(fetched_price, url, page_cache_ttl)
+                    except RequestThrottledError as e:
+                        logger.warning(f"Prodotto '{name}' non aggiornato: {e}")
+                        continue
+
+                    with check_price_lock:
+                        # Il prodotto potrebbe essere stato rimosso durante il download
+                        if name not in products:
+                            continue
+
+                        # Gestione del caso in cui il prezzo non può essere aggiornato passando al prossimo prodotto da aggiornare
+                        if current_price is None:
+                            logger.warning(f"Prodotto '{name}' non aggiornato: non trovato il prezzo sulla pagina {products[name]['url']}")
+
+                            products[name]["price"] = "aggiorna o verifica l'URL: - "
+                            products[name]["timer"] = time.time()
+                            products[name]["date_edited"] = datetime.datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+                            index_product(name)
+
+                            continue
+
+                        # Recupera l'ultimo prezzo memorizzato del prodotto, salvando il nuovo nella stessa sezione critica
+                        previous_price = get_last_price(name)
+                        notify = previous_price is not None and products[name]["notify"]
+
+                        # Copie per la notifica inviata dopo il rilascio del lock (statistiche precedenti al nuovo prezzo)
+                        if notify:
+                            product = dict(products[name])
+                            stats = dict(get_price_stats(name))
+
+                        # Aggiornamento del prodotto
+                        products[name]["price"] = current_price
+                        products[name]["timer"] = time.time()
+                        products[name]["date_edited"] = datetime.datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+                        index_product(name)
+
+                        save_price(name, products[name]["price"])
+
+                    # Aggiunta dei prodotti aggiornati alla lista per il report finale e notifica di un eventuale ribasso
+                    if previous_price is not None:
+                        updated_products.append((name, previous_price, current_price))
                 
-                    # Notifica dei prodotti la cui opzione di avviso è abilitata
-                    if products[name]["notify"]:
-                        send_notification_and_email(name, previous_price, current_price)
+                        # Notifica dei prodotti la cui opzione di avviso è abilitata
+                        if notify:
+                            send_notification_and_email(name, previous_price, current_price, stats, product)
+            finally:
+                stop_notification_digest()
 
-                save_price(name, products[name]["price"])
-
-            save_products()
+            with check_price_lock:
+                save_products()
 
             # Impostazione dei valori limite per la barra di progresso
             loading_dialog.progress_label.config(text=f"Invio di eventuali notifiche...")
@@ -1872,7 +3862,7 @@ def open_progress_dialog(update_all_prices=None, update_all_images=None):
         if update_all_prices:
             update_prices(loading_dialog, products)
         else:
-            selected_products = products_tree.selection()
+            selected_products = get_selected_products()
 
             if not selected_products:
                 logger.warning("Nessun prodotto selezionato per aggiornare il prezzo")
@@ -1908,7 +3898,7 @@ def open_progress_dialog(update_all_prices=None, update_all_images=None):
         if update_all_images:
             check_and_save_new_images(loading_dialog, products)
         else:
-            selected_products = products_tree.selection()
+            selected_products = get_selected_products()
 
             if not selected_products:
                 logger.warning("Nessun prodotto selezionato per aggiornare il prezzo")
@@ -1949,24 +3939,127 @@ def open_progress_dialog(update_all_prices=None, update_all_images=None):
     loading_dialog.wait_window()
 
 
+def get_search_text(name):
+    """
+    Testo su cui viene eseguita la ricerca di un prodotto: nome ed eventuale ASIN estratto dall'URL
+    """
+    asin_match = asin_pattern.search(products[name]["url"])
+
+    return f"{name.lower()}\n{asin_match.group(1).lower()}" if asin_match else name.lower()
+
+
+def get_trigrams(text):
+    """
+    Insieme delle sottostringhe di tre caratteri di un testo
+    """
+    return {text[index:index + 3] for index in range(len(text) - 2)}
+
+
+def index_product_search(name):
+    """
+    Aggiorna l'indice di ricerca a trigrammi dopo l'aggiunta o la modifica di un prodotto
+    """
+    global last_search
+
+    search_text = get_search_text(name)
+
+    with search_index_lock:
+        if search_texts.get(name) == search_text:
+            return
+        
+        unindex_product_search(name)
+
+        search_texts[name] = search_text
+
+        for trigram in get_trigrams(search_text):
+            search_index.setdefault(trigram, set()).add(name)
+
+        # I risultati della ricerca precedente non sono più affidabili
+        last_search = None
+
+
+def unindex_product_search(name):
+    """
+    Rimuove un prodotto dall'indice di ricerca a trigrammi
+    """
+    global last_search
+
+    with search_index_lock:
+        search_text = search_texts.pop(name, None)
+
+        if search_text is None:
+            return
+
+        for trigram in get_trigrams(search_text):
+            search_index[trigram].discard(name)
+
+            if not search_index[trigram]:
+                del search_index[trigram]
+
+        last_search = None
+
+
+def search_products(search_text):
+    """
+    Restituisce i nomi dei prodotti il cui nome (o ASIN) contiene il testo cercato
+    I candidati provengono dall'indice a trigrammi oppure, se il testo estende la ricerca precedente, dai risultati di quest'ultima
+    """
+    global last_search
+
+    query = search_text.lower()
+
+    with search_index_lock:
+        if last_search is not None and last_search[0] in query:
+            # Il testo è stato solo esteso: i risultati possono solo restringersi
+            candidates = last_search[1]
+        elif len(query) >= 3:
+            # Intersezione delle liste di prodotti di ciascun trigramma, partendo dalla più corta
+            postings = sorted((search_index.get(trigram, set()) for trigram in get_trigrams(query)), key=len)
+            candidates = set(postings[0]).intersection(*postings[1:])
+        else:
+            candidates = search_texts.keys()
+
+        # Verifica finale della sottostringa sui soli candidati
+        matching_products = {name for name in candidates if name in search_texts and query in search_texts[name]}
+
+        last_search = (query, matching_products)
+
+    return matching_products
+
+
+def schedule_products_to_view_update(*args):
+    """
+    Rimanda l'aggiornamento dei prodotti da visualizzare finché l'utente non smette di digitare (debounce)
+    """
+    global products_to_view_update_id
+
+    if products_to_view_update_id is not None:
+        root.after_cancel(products_to_view_update_id)
+
+    products_to_view_update_id = root.after(search_debounce_ms, update_products_to_view)
+
+
 def update_products_to_view(*args):
     """
     Aggiorna la lista dei prodotti da visualizzare in base al testo inserito nella barra di ricerca
     """
-    global products_to_view
+    global products_to_view, products_to_view_update_id
 
-    if search_entry.get() != placeholder_text:
-        # Resetta i filtri mantenendo lo stato corrente della barra di ricerca
-        reset_filters(reset_search_bar=False)
+    products_to_view_update_id = None
 
+    if search_entry.get() != placeholder_text:
         search_text = search_entry.get().strip()
 
-        # Filtra i prodotti, altrimenti mostra tutti i prodotti
+        # Filtra i prodotti tramite l'indice di ricerca, altrimenti mostra tutti i prodotti
         if search_text != "":
-            products_to_view = {name: details for name, details in products.items() if search_text.lower() in name.lower()}
+            matching_products = search_products(search_text)
+            products_to_view = {name: products[name] for name in matching_products if name in products}
         else:
             products_to_view = products
 
+        # Resetta i filtri mantenendo lo stato corrente della barra di ricerca (ordina solo i prodotti trovati)
+        reset_filters(reset_search_bar=False)
+
 
 def show_text_menu(event, widget, onlyRead=False):
     """
@@ -2067,32 +4160,14 @@ def sort_by_column(column_name):
         sort_state["column"] = column_name
         sort_state["order"] = 1
 
-    # Elenco dei prodotti da visualizzare come lista di tuple
-    list_products_to_view = list(products_to_view.items())
-    
-    # Mappa delle funzioni di ordinamento per ciascuna colonna
-    column_key_map = {
-        "Nome": lambda item: item[0].lower(),
-        "URL": lambda item: item[1]["url"].lower(),
-        "Prezzo": lambda item: item[1]["price"] if isinstance(item[1]["price"], (int, float)) else float("inf"),
-        "Notifica": lambda item: item[1]["notify"],
-        "Timer": lambda item: (item[1]["timer"] + item[1]["timer_refresh"]) - time.time(),
-        "Timer Aggiornamento [s]": lambda item: item[1]["timer_refresh"],
-        "Data Inserimento": lambda item: item[1]["date_added"],
-        "Data Ultima Modifica": lambda item: item[1]["date_edited"]
-    }
-    
-    # Gestione dei vari stati di ordinamento
+    # Gestione dei vari stati di ordinamento tramite gli indici già ordinati per colonna
     if sort_state["order"] == 0:
-        list_products_to_view.sort(key=column_key_map["Data Ultima Modifica"])
+        products_to_view = get_sorted_products("Data Ultima Modifica", products_to_view)
         sort_state["column"] = None
     elif sort_state["order"] == 1:
-        list_products_to_view.sort(key=column_key_map[column_name])
+        products_to_view = get_sorted_products(column_name, products_to_view)
     else:
-        list_products_to_view.sort(key=column_key_map[column_name], reverse=True)
-
-    # Aggiornamento dell'ordine dei prodotti da visualizzare
-    products_to_view = {name: details for name, details in list_products_to_view}
+        products_to_view = get_sorted_products(column_name, products_to_view, reverse=True)
 
     # Ripristino delle intestazioni delle colonne nella TreeView
     for column in columns:
@@ -2110,11 +4185,77 @@ def select_all_products(event=None):
     """
     global current_index
 
-    products_tree.selection_set(products_tree.get_children())
+    set_products_selection(products_to_view)
 
     current_index = None
 
 
+def get_selected_products():
+    """
+    Restituisce i prodotti selezionati nell'ordine di visualizzazione, compresi quelli
+    fuori dalla finestra visibile in modalità virtuale
+    """
+    return tuple(name for name in list(products_to_view) if name in products_selection)
+
+
+def set_products_selection(names):
+    """
+    Sostituisce la selezione dei prodotti con `names`
+    """
+    products_selection.clear()
+    products_selection.update(names)
+
+    sync_tree_view_selection()
+
+
+def add_products_selection(*names):
+    """
+    Aggiunge i prodotti alla selezione
+    """
+    products_selection.update(names)
+
+    sync_tree_view_selection()
+
+
+def remove_products_selection(*names):
+    """
+    Rimuove i prodotti dalla selezione
+    """
+    products_selection.difference_update(names)
+
+    sync_tree_view_selection()
+
+
+def sync_tree_view_selection():
+    """
+    Riporta la selezione dei prodotti sulle righe materializzate della TreeView
+    """
+    products_tree.selection_set([name for name in rendered_products_order if name in products_selection])
+
+
+def see_product(index):
+    """
+    Rende visibile il prodotto all'indice `index` dei prodotti visualizzati,
+    spostando la finestra dei prodotti materializzati in modalità virtuale
+    """
+    global virtual_list_offset
+
+    if not is_virtual_list_active():
+        products_tree.see(list(products_to_view)[index])
+        return
+    
+    visible_rows = get_virtual_list_visible_rows()
+
+    if index < virtual_list_offset:
+        virtual_list_offset = index
+    elif index >= virtual_list_offset + visible_rows:
+        virtual_list_offset = index - visible_rows + 1
+    else:
+        return
+    
+    refresh_tree_view()
+
+
 def update_tree_view_columns_width(event=None):
     """
     Aggiorna la larghezza delle colonne della TreeView al variare della dimensione della finestra
@@ -2143,31 +4284,27 @@ def click(event):
     """
     global current_index, click_index
 
-    products_in_tree_view = products_tree.get_children()
-    selected_products = products_tree.selection()
-
     # Identifica il prodotto cliccato (basato sulla posizione y del click)
-    identified_product_index = products_tree.identify_row(event.y)
+    identified_product = products_tree.identify_row(event.y)
 
     # Gestione selezione di un prodotto oppure del focus sulle entry
-    if isinstance(event.widget, ttk.Treeview) and identified_product_index in products_in_tree_view: # Non rimuovere isinstance, altrimenti clicca prodotti anche al di fuori del tree
-        # Variabile globale utile per le condizioni della funzione arrow_navigation_and_shift_arrow
-        click_index = products_in_tree_view.index(identified_product_index)
+    if isinstance(event.widget, ttk.Treeview) and identified_product in products_to_view: # Non rimuovere isinstance, altrimenti clicca prodotti anche al di fuori del tree
+        # Variabile globale utile per le condizioni della funzione arrow_navigation_and_shift_arrow (indice tra tutti i prodotti visualizzati)
+        click_index = list(products_to_view).index(identified_product)
 
         current_index = click_index
         
         # Multiselezione con il tasto ctrl premuto 
         if event.state & 0x0004:
             # Toggle del prodotto
-            if products_in_tree_view[current_index] in selected_products:
-                products_tree.selection_remove(products_in_tree_view[current_index])
+            if identified_product in products_selection:
+                remove_products_selection(identified_product)
             else:
-                products_tree.selection_add(products_in_tree_view[current_index])
+                add_products_selection(identified_product)
         else:
-            products_tree.selection_remove(*selected_products)
-            products_tree.selection_add(products_in_tree_view[current_index])
+            set_products_selection([identified_product])
     else:
-        products_tree.selection_remove(*selected_products)
+        set_products_selection([])
 
         current_index = None
 
@@ -2203,61 +4340,63 @@ def shift_click(event):
     """
     global current_index
 
-    products_tree.selection_remove(*products_tree.selection())
-
     # Identifica il prodotto cliccato (basato sulla posizione y del click)
     identified_product = products_tree.identify_row(event.y)
 
-    if not identified_product:
+    if not identified_product or identified_product not in products_to_view:
+        set_products_selection([])
         return
     
+    products_in_view = list(products_to_view)
+
     # Partenza dal primo prodotto se nessun prodotto è stato selezionato 
-    if current_index is None:
+    if current_index is None or current_index >= len(products_in_view):
         current_index = 0
 
-    products_in_tree_view = products_tree.get_children()
-    identified_product_index = products_in_tree_view.index(identified_product)
+    identified_product_index = products_in_view.index(identified_product)
 
     # Determina l'intervallo tra current_index e l'indice del prodotto cliccato
     start = min(current_index, identified_product_index)
     end = max(current_index, identified_product_index)
 
-    # Seleziona tutti i prodotti tra start e end, inclusi entrambi
-    for i in range(start, end + 1):
-        products_tree.selection_add(products_in_tree_view[i])
+    # Seleziona tutti i prodotti tra start e end, inclusi entrambi (anche fuori dalla finestra visibile in modalità virtuale)
+    set_products_selection(products_in_view[start:end + 1])
 
 
 def arrow_navigation_and_shift_arrow(event):
     """
     Navigazione tra i prodotti con le frecce su/giu e multiselezione con shift + freccie su/giu
+    In modalità virtuale la finestra dei prodotti materializzati segue il prodotto navigato
     """
     global current_index, click_index
 
-    products_in_tree_view = products_tree.get_children()
+    products_in_view = list(products_to_view)
 
-    if products_in_tree_view is None:
+    if not products_in_view:
         return
+    
+    # L'indice corrente non è più valido se i prodotti visualizzati sono diminuiti
+    if current_index is not None and current_index >= len(products_in_view):
+        current_index = None
 
-    selected_products = products_tree.selection()
+    selected_products = get_selected_products()
 
     if selected_products:
-        sorted_selected_indexes = [products_tree.index(item) for item in selected_products]
-        sorted_selected_indexes.sort()
+        selected_products_set = set(selected_products)
+        sorted_selected_indexes = [index for index, name in enumerate(products_in_view) if name in selected_products_set]
 
         # Rimuovi la selezione qual'ora i prodotti selezionati non fossero consecutivi o il mouse clicca il primo/l'ultimo prodotto durante la selezione multipla
         for index in range(1, len(sorted_selected_indexes)):
             if (sorted_selected_indexes[index] != sorted_selected_indexes[index - 1] + 1 
                 or current_index not in sorted_selected_indexes 
                 or (current_index > min(sorted_selected_indexes) and current_index < max(sorted_selected_indexes))
-                or click_index == 0 or click_index == len(products_in_tree_view) - 1):
-                products_tree.selection_remove(selected_products)
-
+                or click_index == 0 or click_index == len(products_in_view) - 1):
                 if current_index is None:
-                    current_index = products_tree.index(selected_products[0])
+                    current_index = sorted_selected_indexes[0]
 
                 # Seleziona solo l'elemento di current index
-                products_tree.selection_add(products_in_tree_view[current_index])
-                selected_products = products_tree.selection()
+                set_products_selection([products_in_view[current_index]])
+                selected_products = get_selected_products()
 
                 break
 
@@ -2268,28 +4407,28 @@ def arrow_navigation_and_shift_arrow(event):
         # Partenza dal primo prodotto se nessun prodotto è stato selezionato
         if current_index is None:
             current_index = 0
-            products_tree.selection_remove(selected_products)
-            products_tree.selection_add(products_in_tree_view[current_index])
+            set_products_selection([products_in_view[current_index]])
+            see_product(current_index)
             return
 
         # Limita la selezione all'ultimo prodotto
-        if current_index == len(products_in_tree_view) - 1 or products_in_tree_view[current_index] not in selected_products:
-            products_tree.selection_add(products_in_tree_view[current_index])
+        if current_index == len(products_in_view) - 1 or products_in_view[current_index] not in selected_products:
+            add_products_selection(products_in_view[current_index])
             return
 
         # Calcola il prossimo prodotto da navigare  
-        next_index  = min(current_index + 1, len(products_in_tree_view) - 1)
+        next_index  = min(current_index + 1, len(products_in_view) - 1)
     else:
         # Partenza dall'ultimo prodotto se nessun prodotto è stato selezionato
         if current_index is None:
-            current_index = len(products_in_tree_view) - 1
-            products_tree.selection_remove(selected_products)
-            products_tree.selection_add(products_in_tree_view[current_index])
+            current_index = len(products_in_view) - 1
+            set_products_selection([products_in_view[current_index]])
+            see_product(current_index)
             return
         
         # Limita la selezione al primo prodotto
-        if current_index == 0 or products_in_tree_view[current_index] not in selected_products:
-            products_tree.selection_add(products_in_tree_view[current_index])
+        if current_index == 0 or products_in_view[current_index] not in selected_products:
+            add_products_selection(products_in_view[current_index])
             return
         
         # Calcola il prossimo prodotto da navigare  
@@ -2299,16 +4438,15 @@ def arrow_navigation_and_shift_arrow(event):
     # Multiselezione con il tasto shift premuto 
     if event.state & 0x0001:
         # Toggle del prodotto
-        if products_in_tree_view[next_index] in selected_products:
-            products_tree.selection_remove(products_in_tree_view[current_index])
+        if products_in_view[next_index] in selected_products:
+            remove_products_selection(products_in_view[current_index])
         else:
-            products_tree.selection_add(products_in_tree_view[next_index])
+            add_products_selection(products_in_view[next_index])
     else:
-        products_tree.selection_remove(selected_products)
-        products_tree.selection_add(products_in_tree_view[next_index])
+        set_products_selection([products_in_view[next_index]])
 
-    # Scrolla la TreeView per rendere visibile il prodotto navigato/selezionato
-    products_tree.see(products_in_tree_view[next_index])
+    # Scrolla la TreeView (o sposta la finestra virtuale) per rendere visibile il prodotto navigato/selezionato
+    see_product(next_index)
 
     current_index = next_index
 
@@ -2317,7 +4455,7 @@ def on_menu_open():
     """
     Aggiornamento dello stato delle opzioni in base al numero di prodotti selezionati
     """
-    num_selected_products = len(products_tree.selection())
+    num_selected_products = len(get_selected_products())
 
     if num_selected_products == 1:
         action_menu.entryconfig("Visualizza", state="normal")
@@ -2346,19 +4484,16 @@ def show_tree_view_menu(event):
     """
     global current_index
 
-    products_in_tree_view = products_tree.get_children()
-    selected_products = products_tree.selection()
-
     # Identifica il prodotto cliccato (basato sulla posizione y del click)
-    identified_product_index = products_tree.identify_row(event.y)
+    identified_product = products_tree.identify_row(event.y)
     
-    if identified_product_index in products_in_tree_view:
+    if identified_product in products_to_view:
         # Selezione del prodotto, qual'ora questo non lo fosse
-        if identified_product_index not in selected_products:
-            products_tree.selection_set(identified_product_index)
-            products_tree.focus(identified_product_index)
+        if identified_product not in products_selection:
+            set_products_selection([identified_product])
+            products_tree.focus(identified_product)
 
-        selected_products = products_tree.selection()
+        selected_products = get_selected_products()
     
         # Mostra il menu contestuale appropriato in base al numero di prodotti selezionati
         if len(selected_products) == 1:
@@ -2368,7 +4503,7 @@ def show_tree_view_menu(event):
     else:
         # Deseleziona solo se l'evento proviene dal widget della TreeView
         if event.widget == products_tree:
-            products_tree.selection_remove(*selected_products)
+            set_products_selection([])
 
             no_selection_menu.post(event.x_root, event.y_root)
 
@@ -2386,8 +4521,8 @@ def on_hover_products_tree(event):
 
     # Se il mouse è sopra una riga e non è la stessa già evidenziata
     if row_id and row_id != hovered_row_products_tree:
-        # Resetta il colore della riga precedentemente evidenziata
-        if hovered_row_products_tree:
+        # Resetta il colore della riga precedentemente evidenziata (se ancora presente nella TreeView)
+        if hovered_row_products_tree and products_tree.exists(hovered_row_products_tree):
             products_tree.item(hovered_row_products_tree, tags=())
 
         # Assegna il tag "hover" alla nuova riga
@@ -2397,66 +4532,172 @@ def on_hover_products_tree(event):
 
     # Se il mouse non è sopra una riga, resetta l'hover
     elif not row_id and hovered_row_products_tree:
-        if hovered_row_products_tree in products_to_view:
+        if products_tree.exists(hovered_row_products_tree):
             products_tree.item(hovered_row_products_tree, tags=())
         hovered_row_products_tree = None
 
 
-def periodic_refresh_root():
+def is_virtual_list_active():
     """
-    Aggiornamento periodico della Root
+    Verifica se la TreeView dei prodotti è in modalità virtuale (catalogo troppo grande per materializzare tutte le righe)
+    """
+    return len(products_to_view) > virtual_list_threshold
+
+
+def get_virtual_list_visible_rows():
+    """
+    Numero di righe che la TreeView dei prodotti può mostrare con l'altezza attuale (esclusa l'intestazione)
+    """
+    return max(1, products_tree.winfo_height() // products_tree_row_height - 1)
+
+
+def get_virtual_list_range(total_products):
+    """
+    Calcola l'intervallo dei prodotti da materializzare in modalità virtuale (righe visibili più un margine)
+    e aggiorna di conseguenza la scrollbar verticale
+    """
+    global virtual_list_offset
+
+    visible_rows = get_virtual_list_visible_rows()
+
+    # La finestra visibile non può uscire dai limiti della lista
+    virtual_list_offset = max(0, min(virtual_list_offset, total_products - visible_rows))
+
+    scrollbar_vertical.set(virtual_list_offset / total_products, min(1, (virtual_list_offset + visible_rows) / total_products))
+
+    return virtual_list_offset, min(total_products, virtual_list_offset + visible_rows + virtual_list_overscan)
+
+
+def scroll_products_tree(*args):
+    """
+    Comando della scrollbar verticale della TreeView dei prodotti
+    In modalità virtuale sposta la finestra dei prodotti materializzati invece di scorrere le righe esistenti
+    """
+    global virtual_list_offset
+
+    if not is_virtual_list_active():
+        products_tree.yview(*args)
+        return
+    
+    if args[0] == "moveto":
+        virtual_list_offset = int(float(args[1]) * len(products_to_view))
+    elif args[0] == "scroll":
+        virtual_list_offset += int(args[1]) * (get_virtual_list_visible_rows() if args[2] == "pages" else 1)
+
+    refresh_tree_view()
+
+
+def on_products_tree_yscroll(first, last):
+    """
+    Aggiornamento della scrollbar verticale da parte della TreeView, ignorato in modalità virtuale
+    """
+    if not is_virtual_list_active():
+        scrollbar_vertical.set(first, last)
+
+
+def on_products_tree_mouse_wheel(event):
+    """
+    Scorrimento con la rotella del mouse della TreeView dei prodotti in modalità virtuale
+    """
+    global virtual_list_offset
+
+    if not is_virtual_list_active():
+        return
+    
+    virtual_list_offset -= int(event.delta / 120) * 3
+
+    refresh_tree_view()
+
+    return "break"
+
+
+def refresh_tree_view():
     """
-    def refresh_tree_view():
+    Aggiornamento della TreeView con i prodotti monitorati
+    """
+    def calculate_remaining_time(last_checked_time, update_interval):
         """
-        Aggiornamento della TreeView con i prodotti monitorati
+        Calcolo tempo rimanente fino al prossimo aggiornamento
         """
-        def calculate_remaining_time(last_checked_time, update_interval):
-            """
-            Calcolo tempo rimanente fino al prossimo aggiornamento
-            """
-            next_check = last_checked_time + update_interval
-            remaining_time = next_check - time.time()
-            
-            # Il tempo rimanente non può mai essere inferiore a 0
-            if remaining_time < 0:
-                remaining_time = 0
+        next_check = last_checked_time + update_interval
+        remaining_time = next_check - time.time()
+        
+        # Il tempo rimanente non può mai essere inferiore a 0
+        if remaining_time < 0:
+            remaining_time = 0
+
+        hours, remainder = divmod(remaining_time, 3600)
+        minutes, seconds = divmod(remainder, 60)
+
+        return f"{int(hours)}h {int(minutes)}m {int(seconds)}s"
+
+    global rendered_products_order
+
+    names_to_view = list(products_to_view)
+    virtual_list_active = len(names_to_view) > virtual_list_threshold
+
+    if virtual_list_active:
+        # Modalità virtuale: vengono materializzate solo le righe visibili più un margine
+        start, end = get_virtual_list_range(len(names_to_view))
+        names_to_view = names_to_view[start:end]
+
+    # La selezione è mantenuta in `products_selection`: vengono scartati i prodotti non più visualizzati (rimossi o filtrati)
+    products_selection.difference_update([name for name in products_selection if name not in products_to_view])
+
+    # Valori attesi per ciascuna riga nell'ordine dei prodotti da visualizzare
+    new_rows = {
+        name: (name, products_to_view[name]["url"], 
+               f"{str(products_to_view[name]['price'])}€",
+               "Si" if products_to_view[name]["notify"] else "No",
+               calculate_remaining_time(products_to_view[name]["timer"], products_to_view[name].get("timer_effective", products_to_view[name]["timer_refresh"])),
+               f"{products_to_view[name]['timer_effective']} (adattivo)" if products_to_view[name].get("adaptive_timer") and "timer_effective" in products_to_view[name] else products_to_view[name]["timer_refresh"],
+               products_to_view[name]["date_added"],
+               products_to_view[name]["date_edited"])
+        for name in names_to_view
+    }
 
-            hours, remainder = divmod(remaining_time, 3600)
-            minutes, seconds = divmod(remainder, 60)
+    # Rimozione delle sole righe non più da visualizzare (le righe restanti mantengono selezione e hover)
+    for name in rendered_products_order:
+        if name not in new_rows:
+            products_tree.delete(name)
+            del rendered_products_rows[name]
 
-            return f"{int(hours)}h {int(minutes)}m {int(seconds)}s"
+    # Inserimento delle nuove righe e aggiornamento delle sole celle cambiate (di solito il "Timer")
+    for name, values in new_rows.items():
+        rendered_values = rendered_products_rows.get(name)
 
-        products_in_tree_view = products_tree.get_children()
-        
-        # Non spostarlo da qui perchè il reset della TreeView mi fa perdere le selezioni
-        selected_products = products_tree.selection()
-
-        # Reset della TreeView
-        products_tree.delete(*products_in_tree_view)
-
-        # Inserimento dei prodotti con i dati aggiornati nella TreeView
-        for name in products_to_view:
-            products_tree.insert("", "end", iid=name, 
-                                 values=(name,products_to_view[name]["url"], 
-                                         f"{str(products_to_view[name]['price'])}€",
-                                        "Si" if products_to_view[name]["notify"] else "No",
-                                        calculate_remaining_time(products_to_view[name]["timer"], products_to_view[name]["timer_refresh"]),
-                                        products_to_view[name]["timer_refresh"],
-                                        products_to_view[name]["date_added"],
-                                        products_to_view[name]["date_edited"]
-                                        ))
-        
-        products_in_tree_view = products_tree.get_children()
+        if rendered_values is None:
+            products_tree.insert("", "end", iid=name, values=values)
+
+            # Ripristino della selezione delle righe tornate nella finestra visibile
+            if name in products_selection:
+                products_tree.selection_add(name)
+        else:
+            for column, value, rendered_value in zip(columns, values, rendered_values):
+                if value != rendered_value:
+                    products_tree.set(name, column, value)
+
+        rendered_products_rows[name] = values
+
+    # Spostamento delle righe solo se l'ordinamento è cambiato
+    new_order = list(new_rows)
+    current_order = [name for name in rendered_products_order if name in new_rows] + [name for name in new_order if name not in rendered_products_order]
+
+    if current_order != new_order:
+        for index, name in enumerate(new_order):
+            products_tree.move(name, "", index)
+
+    rendered_products_order = new_order
 
-        # Ripristino della selezione precedentemente salvata nella TreeView
-        for product in selected_products:
-            if product in products_in_tree_view:
-                products_tree.selection_add(product)
+    # In modalità virtuale la prima riga materializzata è sempre quella in cima
+    if virtual_list_active:
+        products_tree.yview_moveto(0)
 
-        # Ripristina la riga in hover, se esiste ancora
-        if hovered_row_products_tree in products_in_tree_view:
-            products_tree.item(hovered_row_products_tree, tags=("hover",))
 
+def periodic_refresh_root():
+    """
+    Aggiornamento periodico della Root
+    """
     if is_possible_to_refresh_root:
         refresh_tree_view()
 
@@ -2467,34 +4708,32 @@ def periodic_refresh_root():
 def set_periodic_refresh_root(update=True):
     """
     Funzione principale che gestisce l'abilitazione o la disabilitazione del refresh periodico
-    Se `update` è True, abilita i controlli, resettando i thread che monitorano i prodotti e avviando il refresh periodico
-    Se `update` è False, disabilita i controlli e ferma i thread che monitorano i prodotti
+    Se `update` è True, abilita i controlli, resettando i timer di monitoraggio dei prodotti e avviando il refresh periodico
+    Se `update` è False, disabilita i controlli e ferma il monitoraggio dei prodotti
     """
-    def reset_threads():
+    def reset_trackers():
         """
-        Reset dei thread che monitorano i prodotti
+        Reset dei timer di monitoraggio dei prodotti nello scheduler
         """
         for name in products:
             start_tracking(name, products[name]["url"])
 
-    def stop_threads():
+    def stop_trackers():
         """
-        Ferma i thread che monitorano i prodotti
+        Ferma il monitoraggio dei prodotti nello scheduler
         """
         for name in products:
-            stop_events[name].set() # Segnala al thread corrente di fermarsi
-            threads[name].join(timeout=1) # Aspetta che il thread corrente termini
-            del threads[name]
+            stop_tracking(name)
 
     global is_possible_to_refresh_root
 
     if update:
         is_possible_to_refresh_root = True
         periodic_refresh_root()
-        reset_threads()
+        reset_trackers()
     else:
         is_possible_to_refresh_root = False
-        stop_threads()
+        stop_trackers()
 
 
 # Variabili globali
@@ -2502,25 +4741,176 @@ columns = ("Nome", "URL", "Prezzo", "Notifica", "Timer", "Timer Aggiornamento [s
 column_width_percentages = [0.210, 0.175, 0.135, 0.055, 0.075, 0.12, 0.115, 0.115]
 
 config_file = "config.json"
+config_required_keys = ("sender_email", "sender_password", "receiver_email", "url_telegram", "chat_id_telegram")
+config_cache = None # Ultima configurazione letta e valida
+config_cache_mtime = None # Data di modifica del file di configurazione al momento della lettura
+config_lock = threading.Lock()
+
+smtp_pool = {} # Connessioni SMTP autenticate e inattive, con l'ora dell'ultimo utilizzo, per server e mittente
+smtp_pool_lock = threading.Lock()
+smtp_pool_max_idle = 4 # Numero massimo di connessioni inattive conservate per server e mittente
+smtp_idle_timeout = 60 # Secondi di inattività dopo i quali una connessione del pool viene chiusa
+smtp_timeout = 30 # Timeout delle operazioni sul server SMTP [s]
+smtp_sweep_timer = None # Timer della chiusura delle connessioni inattive del pool
+
+notification_queue_size = 1000 # Numero massimo di invii in attesa nella coda delle notifiche
+notification_queue = queue.Queue(maxsize=notification_queue_size)
+notification_workers = 2 # Thread dedicati all'invio delle notifiche
+notification_threads = []
+notification_lock = threading.Lock()
+notification_retries = {} # Notifiche in attesa di un nuovo tentativo, con il relativo timer
+notification_max_attempts = 5 # Tentativi di invio prima di registrare una notifica come non consegnata
+notification_retry_base = 10 # Attesa prima del secondo tentativo, raddoppiata ad ogni tentativo successivo [s]
+notification_retry_max = 600 # Attesa massima tra due tentativi [s]
+notification_shutdown_timeout = 10 # Attesa massima alla chiusura per la consegna delle notifiche in coda [s]
+notifications_dead_letter_file = "notifications_dead_letter.jsonl"
+notification_dead_letter_lock = threading.Lock()
+
+notification_digest = {"telegram": [], "emails": {}} # Notifiche raccolte per il prossimo riepilogo (emails: destinatario -> messaggi)
+notification_digest_lock = threading.Lock()
+notification_digest_timer = None
+notification_digest_batches = 0 # Aggiornamenti in corso le cui notifiche vengono raccolte in un unico riepilogo
+notification_digest_window = 0 # Secondi in cui raccogliere in un riepilogo le notifiche dei controlli periodici (0: invio immediato)
+notification_digest_email_max_length = 100000 # Lunghezza massima del corpo di un'email di riepilogo, oltre viene divisa in più email [caratteri]
+notification_digest_email_max_images = 20 # Immagini massime allegate a un'email di riepilogo
+telegram_max_message_length = 4096 # Lunghezza massima di un messaggio Telegram [caratteri]
+
+# Modelli precompilati dei testi delle notifiche (metodi `format` dei modelli, definiti una sola volta)
+notification_subject = "Prezzo in calo!"
+notification_threshold_subject = "Prezzo inferiore alla soglia indicata!"
+notification_templates = {
+    "text_headline": "Il prezzo dell'articolo '{0}' è sceso da {1}€ a {2}€.\n\n".format,
+    "text_details_first": "Dettagli:\n\t- Primo ribasso del prezzo rilevato\n\nNon ho abbastanza dati nello storico del prodotto per fornire un suggerimento sulla validità dell'acquisto\n\n".format,
+    "text_details": "Dettagli:\n\t- Prezzo medio: {0}€\n\t- Prezzo minimo storico: {1}€\n\t- Prezzo massimo storico: {2}€\n\n{3}\n\n".format,
+    "text_footer": "Acquista ora: {0}".format,
+    "html_headline": "Il prezzo dell'articolo '{0}' è sceso da {1}€ a {2}€.<br><br>".format,
+    "html_threshold_head": "Il prezzo dell'articolo '{0}' è al di sotto della soglia di ".format, # Seguito dalla soglia del destinatario
+    "html_threshold_tail": "€ indicata.<br>Il costo attuale è {0}€.<br><br>".format,
+    "html_details_first": "Dettagli:<br>\t- Primo ribasso del prezzo rilevato<br><br>Non ho abbastanza dati nello storico del prodotto per fornire un suggerimento sulla validità dell'acquisto.<br><br>".format,
+    "html_details": "Dettagli:<br>\t- Prezzo medio: {0}€<br>\t- Prezzo minimo storico: {1}€<br>\t- Prezzo massimo storico: {2}€<br><br>{3}<br><br>".format,
+    "html_footer": "Acquista ora: <a href='{0}'>clicca qui</a><br><br>".format,
+    "html_image": "<img src='cid:image1'>".format
+}
+
+# Funzioni di invio di ciascun tipo di notifica
+notification_senders = {"email": deliver_email, "telegram": deliver_telegram_message}
 
 products_file = "products.json"
 products = {}
 products_to_view = {}
 
 prices_file = "prices.json"
+prices_log_file = "prices_log.jsonl"
+prices_log_entries = 0
+prices_log_compaction_threshold = 1000 # Numero di voci nel log oltre il quale viene compattato nello snapshot
+prices_log_lock = threading.RLock()
+prices_log_pending = [] # Righe del log dei prezzi in attesa dello scrittore in background
 prices = {}
+epoch = datetime.datetime(1970, 1, 1)
+prices_stats_file = "prices_stats.json"
+price_stats = {} # Statistiche aggregate dei prezzi di ciascun prodotto, aggiornate ad ogni nuovo prezzo
+prices_index_file = "prices_index.json"
+prices_snapshot_log_hash = None # Impronta del log incluso nell'ultimo snapshot, se lo storico viene caricato tramite indice
 prices_graph_application = None
 
 emails_file = "emails.json"
 emails = []
 
+storage_backend = "json" # Archivio dei dati: "json" (file) oppure "sqlite" (database)
+database_file = "amazon_tracker.db"
+database_connection = None
+database_lock = threading.RLock()
+database_pending_prices = [] # Righe dei prezzi in attesa del prossimo commit
+database_pending_stats = set() # Prodotti le cui statistiche vanno salvate al prossimo commit
+database_batch_size = 200 # Numero di prezzi raccolti prima di un commit
+database_commit_interval = 5 # Attesa massima di un prezzo prima del commit [s]
+database_flush_timer = None
+database_migration_version = 1 # Valore di PRAGMA user_version che indica la migrazione dei file JSON completata
+
+persistence_dirty = set() # Tipi di dati modificati e non ancora salvati
+persistence_condition = threading.Condition()
+persistence_write_lock = threading.Lock()
+persistence_thread = None
+persistence_flush_interval = 2 # Intervallo minimo tra due scritture dei dati su disco [s]
+persistence_last_flush = 0
+
+snapshot_backups = 3 # Numero di copie di sicurezza conservate per i file dei prodotti e dello storico dei prezzi
+snapshot_backup_interval = 3600 # Intervallo minimo tra due rotazioni delle copie di sicurezza [s]
+snapshot_rotations = {} # Ultima rotazione delle copie di sicurezza di ciascun file
+
+# Funzioni di scrittura di ciascun tipo di dati, nell'ordine in cui vengono salvati
+persistence_writers = {"products": write_products, "prices": write_prices, "prices_log": write_prices_log, "emails": write_emails}
+
 images_dir = os.path.join(os.getcwd(), "images")
 
-threads = {}
-stop_events = {}
+adaptive_timer_min_default = 300 # Limite minimo di default del timer adattivo [s]
+adaptive_timer_max_default = 7200 # Limite massimo di default del timer adattivo [s]
+adaptive_timer_window = 20 # Numero di prezzi recenti usati per stimare la variabilità del prezzo
+
+tracking_heap = [] # Coda a priorità (scadenza, generazione, nome, url) dei prossimi controlli
+tracking_generations = {} # Generazione valida del monitoraggio di ciascun prodotto
+tracking_generation_counter = itertools.count()
+tracking_condition = threading.Condition()
+tracking_scheduler_thread = None
 reset_filters_lock = threading.Lock()
 check_price_lock = threading.Lock()
 
+http_session = None
+http_session_lock = threading.Lock()
+http_headers = {
+    "User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36",
+    "Accept-Language": "it-IT,it;q=0.9",
+    # Trasferimento compresso: brotli viene richiesto solo se è installato un decoder (brotli o brotlicffi)
+    "Accept-Encoding": "gzip, deflate, br" if importlib.util.find_spec("brotli") or importlib.util.find_spec("brotlicffi") else "gzip, deflate",
+}
+http_timeout = (5, 20) # Timeout in secondi per connessione e lettura di ogni richiesta HTTP
+http_pool_hosts = 4 # Numero di host (Amazon, immagini, Telegram) di cui mantenere un pool di connessioni
+http_pool_max_per_host = 8 # Numero massimo di connessioni aperte verso lo stesso host
+
+price_text_pattern = re.compile(r"\d{1,3}(?:\.\d{3})*(?:,\d{2})?")
+product_title_pattern = re.compile(rb"<span[^>]*\bid\s*=\s*[\"']productTitle[\"'][^>]*>(.*?)</span>", re.DOTALL)
+price_offscreen_pattern = re.compile(rb"<span[^>]*\bclass\s*=\s*[\"'][^\"']*\baok-offscreen\b[^\"']*[\"'][^>]*>(.*?)</span>", re.DOTALL)
+landing_image_pattern = re.compile(rb"<img[^>]*\bid\s*=\s*[\"']landingImage[\"'][^>]*>", re.DOTALL)
+image_src_pattern = re.compile(rb"(?<![\w-])src\s*=\s*[\"']([^\"']*)[\"']")
+html_tag_pattern = re.compile(rb"<[^>]*>")
+
+# Estrattori provati in ordine: il primo che trova prezzo e immagine evita quelli successivi
+page_extractors = [extract_product_page_fast, extract_product_page_soup]
+
+page_cache = {} # Ultima pagina analizzata per ciascun URL
+page_cache_lock = threading.Lock()
+page_cache_ttl = 120 # Secondi entro i quali una pagina analizzata può essere riutilizzata senza scaricarla di nuovo
+
+max_concurrent_fetches = 8 # Numero massimo di pagine prodotto scaricate in parallelo
+fetch_executor = ThreadPoolExecutor(max_workers=max_concurrent_fetches, thread_name_prefix="fetch")
+
+rate_limit_per_second = 4 # Richieste al secondo consentite verso Amazon a regime
+rate_limit_burst = max_concurrent_fetches # Richieste consecutive consentite prima di applicare il limite (una per ogni download in parallelo)
+rate_limit_jitter = 0.5 # Ritardo casuale massimo aggiunto alle richieste rimandate dal limite [s]
+rate_limit_tokens = rate_limit_burst
+rate_limit_updated = time.time()
+rate_limit_lock = threading.Lock()
+host_backoff = {} # Tentativi bloccati consecutivi e fine del backoff per ciascun host
+host_backoff_base = 30 # Backoff iniziale dopo un captcha o una risposta 503 [s]
+host_backoff_max = 1800 # Backoff massimo [s]
+captcha_markers = (b"/errors/validateCaptcha", b"api-services-support@amazon.com", b"Robot Check")
+tracking_start_jitter = 60 # Ritardo casuale massimo sulla prima scadenza di un prodotto avviato o riavviato [s]
+
+max_tracking_workers = 16 # Numero massimo di controlli di prodotti scaduti eseguiti in parallelo
+tracking_executor = ThreadPoolExecutor(max_workers=max_tracking_workers, thread_name_prefix="tracking")
+
+
+sort_indexes = {} # Per ciascuna colonna, lista ordinata di (chiave, nome prodotto)
+sort_index_keys = {} # Per ciascuna colonna, chiave di ordinamento corrente di ogni prodotto
+sort_indexes_lock = threading.RLock()
+
+search_index = {} # Trigramma -> nomi dei prodotti il cui testo di ricerca lo contiene
+search_texts = {} # Testo di ricerca (nome ed ASIN) indicizzato per ciascun prodotto
+search_index_lock = threading.RLock()
+last_search = None # (testo cercato, prodotti trovati) dell'ultima ricerca, per restringere quella successiva
+asin_pattern = re.compile(r"/(?:dp|gp/product)/([A-Z0-9]{10})")
+search_debounce_ms = 250 # Attesa dopo l'ultimo tasto premuto prima di filtrare i prodotti
+products_to_view_update_id = None
 
 sort_state = {
     "column": None,
@@ -2536,151 +4926,187 @@ is_possible_to_refresh_root = True
 hovered_row_products_tree = None
 hovered_row_email_and_threshold_tree = None
 
-# Interfaccia principale
-root = tk.Tk()
-root.title("Monitoraggio Prezzi Amazon")
-root.minsize(900, 300)
-root.wm_state("zoomed")
-
-limit_letters = (root.register(lambda s: len(s) <= 50), "%P") # Regola per limitare i caratteri da inserire
-
-# Creazione della barra di menu
-menu_bar = tk.Menu(root)
-menu_bar.configure(postcommand=on_menu_open)
-
-# Menu "File"
-file_menu = tk.Menu(menu_bar, tearoff=0)
-file_menu.add_command(label="Nuovo", command=open_add_product_dialog)
-file_menu.add_separator()
-file_menu.add_command(label="Esci", command=root.quit)
-
-
-# Menu "Modifica"
-action_menu = tk.Menu(menu_bar, tearoff=0)
-action_menu.add_command(label="Visualizza", command=show_product_details, state="disabled")
-action_menu.add_command(label="Modifica prodotto", command=open_edit_product_dialog, state="disabled")
-action_menu.add_command(label="Rimuovi prodotto", command=remove_products, state="disabled")
-
-# Menu "Aggiorna"
-update_menu = tk.Menu(menu_bar, tearoff=0)
-
-images_menu = tk.Menu(update_menu, tearoff=0)
-images_menu.add_command(label="Aggiorna immagini", command=lambda: open_progress_dialog(update_all_images=True))
-images_menu.add_command(label="Aggiorna selezionate", command=lambda: open_progress_dialog(update_all_images=False), state="disabled")
-images_menu.add_command(label="Vai alla cartella immagini", command=open_images_folder)
-update_menu.add_cascade(label="Immagini", menu=images_menu)
-
-products_menu = tk.Menu(update_menu, tearoff=0)
-products_menu.add_command(label="Aggiorna prodotti", command=lambda: open_progress_dialog(update_all_prices=True))
-products_menu.add_command(label="Aggiorna selezionati", command=lambda: open_progress_dialog(update_all_prices=False), state="disabled")
-update_menu.add_cascade(label="Prodotti", menu=products_menu)
-
-# Menu "Impostazioni"
-history_menu = tk.Menu(menu_bar, tearoff=0)
-history_menu.add_command(label="Pulisci cronologia prodotti", command=clean_products_and_prices_history)
-history_menu.add_command(label="Pulisci cronologia email", command=clean_emails_history)
-
-# Menu "Aiuto"
-help_menu = tk.Menu(menu_bar, tearoff=0)
-help_menu.add_command(label="Info", command=open_about_dialog)
-
-# Aggiungi il menu "Modifica" alla barra di menu
-menu_bar.add_cascade(label="File", menu=file_menu)
-menu_bar.add_cascade(label="Azioni", menu=action_menu)
-menu_bar.add_cascade(label="Aggiorna", menu=update_menu)
-menu_bar.add_cascade(label="Impostazioni", menu=history_menu)
-menu_bar.add_cascade(label="Aiuto", menu=help_menu)
-
-# Configura la barra di menu nell'interfaccia principale
-root.config(menu=menu_bar)
-
-# Barra di ricerca
-placeholder_text = "Cerca un prodotto..."
-
-# Crea una StringVar per monitorare le modifiche all'Entry
-search_entry_var = tk.StringVar()
-search_entry_var.trace_add("write", update_products_to_view)
-
-search_entry = tk.Entry(root, width=75, font=("Arial", 12), validate="key", validatecommand=limit_letters, textvariable=search_entry_var)
-search_entry.pack(padx=40, pady=20, anchor= "e")
-
-# Imposta il placeholder
-search_entry.insert(0, placeholder_text)
-search_entry.config(fg='grey')  # Colore del testo del placeholder
-
-# Configura lo stile della Treeview
-style = ttk.Style()
-style.configure("Treeview", rowheight=25)
-
-# Lista prodotti
-frame_products_list = ttk.Frame(root)
-frame_products_list.pack(fill="both", expand=True, padx=(15, 10), pady=(10, 0))
-
-products_tree = ttk.Treeview(frame_products_list, columns=columns, show="headings", selectmode="none")
-products_tree.grid(row=0, column=0, sticky="nsew")
-
-for col in columns:
-    products_tree.heading(col, text=col, anchor="center", command=lambda _col=col: sort_by_column(_col))
-    products_tree.column(col,
-                         anchor="center" if col in ["Prezzo", "Notifica", "Timer", "Timer Aggiornamento [s]", "Data Inserimento", "Data Ultima Modifica"] else "w", 
-                         stretch=False)
-    
-scrollbar_vertical = ttk.Scrollbar(frame_products_list, orient="vertical", command=products_tree.yview)
-scrollbar_vertical.grid(row=0, column=1, sticky="ns")
-
-scrollbar_horizontal = ttk.Scrollbar(frame_products_list, orient="horizontal", command=products_tree.xview)
-scrollbar_horizontal.grid(row=1, column=0, sticky="ew")
+rendered_products_rows = {} # Valori delle righe attualmente mostrate nella TreeView dei prodotti
+rendered_products_order = [] # Ordine delle righe attualmente mostrate nella TreeView dei prodotti
+
+virtual_list_threshold = 500 # Oltre questo numero di prodotti la TreeView materializza solo le righe visibili
+virtual_list_overscan = 10 # Righe materializzate oltre quelle visibili
+virtual_list_offset = 0 # Indice del primo prodotto visibile in modalità virtuale
+products_selection = set() # Prodotti selezionati, anche se fuori dalla finestra visibile in modalità virtuale
+products_tree_row_height = 25
 
-frame_products_list.grid_rowconfigure(0, weight=1)
-frame_products_list.grid_columnconfigure(0, weight=1)
+# L'interfaccia viene avviata solo eseguendo il file, non importandolo (es. dagli script in bench/)
+if __name__ == "__main__":
+    # Interfaccia principale
+    root = tk.Tk()
+    root.title("Monitoraggio Prezzi Amazon")
+    root.minsize(900, 300)
+    root.wm_state("zoomed")
 
-products_tree.configure(yscrollcommand=scrollbar_vertical.set, xscrollcommand=scrollbar_horizontal.set)
-products_tree.tag_configure("hover", background="#cceeff")
+    limit_letters = (root.register(lambda s: len(s) <= 50), "%P") # Regola per limitare i caratteri da inserire
+
+    # Creazione della barra di menu
+    menu_bar = tk.Menu(root)
+    menu_bar.configure(postcommand=on_menu_open)
+
+    # Menu "File"
+    file_menu = tk.Menu(menu_bar, tearoff=0)
+    file_menu.add_command(label="Nuovo", command=open_add_product_dialog)
+    file_menu.add_separator()
+    file_menu.add_command(label="Esci", command=root.quit)
 
-# Footer
-frame_footer = ttk.Frame(root)
-frame_footer.pack(side="bottom", fill="x", padx=(20, 40), pady=2)
 
-creator_label = tk.Label(frame_footer, text="Prodotto da Vincenzo Salvati", font=("Arial", 8))
-creator_label.pack(side="right")
+    # Menu "Modifica"
+    action_menu = tk.Menu(menu_bar, tearoff=0)
+    action_menu.add_command(label="Visualizza", command=show_product_details, state="disabled")
+    action_menu.add_command(label="Modifica prodotto", command=open_edit_product_dialog, state="disabled")
+    action_menu.add_command(label="Rimuovi prodotto", command=remove_products, state="disabled")
+
+    # Menu "Aggiorna"
+    update_menu = tk.Menu(menu_bar, tearoff=0)
+
+    images_menu = tk.Menu(update_menu, tearoff=0)
+    images_menu.add_command(label="Aggiorna immagini", command=lambda: open_progress_dialog(update_all_images=True))
+    images_menu.add_command(label="Aggiorna selezionate", command=lambda: open_progress_dialog(update_all_images=False), state="disabled")
+    images_menu.add_command(label="Vai alla cartella immagini", command=open_images_folder)
+    update_menu.add_cascade(label="Immagini", menu=images_menu)
+
+    products_menu = tk.Menu(update_menu, tearoff=0)
+    products_menu.add_command(label="Aggiorna prodotti", command=lambda: open_progress_dialog(update_all_prices=True))
+    products_menu.add_command(label="Aggiorna selezionati", command=lambda: open_progress_dialog(update_all_prices=False), state="disabled")
+    update_menu.add_cascade(label="Prodotti", menu=products_menu)
+
+    # Menu "Impostazioni"
+    history_menu = tk.Menu(menu_bar, tearoff=0)
+    history_menu.add_command(label="Pulisci cronologia prodotti", command=clean_products_and_prices_history)
+    history_menu.add_command(label="Pulisci cronologia email", command=clean_emails_history)
+
+    # Menu "Aiuto"
+    help_menu = tk.Menu(menu_bar, tearoff=0)
+    help_menu.add_command(label="Info", command=open_about_dialog)
+
+    # Aggiungi il menu "Modifica" alla barra di menu
+    menu_bar.add_cascade(label="File", menu=file_menu)
+    menu_bar.add_cascade(label="Azioni", menu=action_menu)
+    menu_bar.add_cascade(label="Aggiorna", menu=update_menu)
+    menu_bar.add_cascade(label="Impostazioni", menu=history_menu)
+    menu_bar.add_cascade(label="Aiuto", menu=help_menu)
+
+    # Configura la barra di menu nell'interfaccia principale
+    root.config(menu=menu_bar)
+
+    # Barra di ricerca
+    placeholder_text = "Cerca un prodotto..."
+
+    # Crea una StringVar per monitorare le modifiche all'Entry
+    search_entry_var = tk.StringVar()
+    search_entry_var.trace_add("write", schedule_products_to_view_update)
+
+    search_entry = tk.Entry(root, width=75, font=("Arial", 12), validate="key", validatecommand=limit_letters, textvariable=search_entry_var)
+    search_entry.pack(padx=40, pady=20, anchor= "e")
+
+    # Imposta il placeholder
+    search_entry.insert(0, placeholder_text)
+    search_entry.config(fg='grey')  # Colore del testo del placeholder
+
+    # Configura lo stile della Treeview
+    style = ttk.Style()
+    style.configure("Treeview", rowheight=products_tree_row_height)
+
+    # Lista prodotti
+    frame_products_list = ttk.Frame(root)
+    frame_products_list.pack(fill="both", expand=True, padx=(15, 10), pady=(10, 0))
+
+    products_tree = ttk.Treeview(frame_products_list, columns=columns, show="headings", selectmode="none")
+    products_tree.grid(row=0, column=0, sticky="nsew")
+
+    for col in columns:
+        products_tree.heading(col, text=col, anchor="center", command=lambda _col=col: sort_by_column(_col))
+        products_tree.column(col,
+                             anchor="center" if col in ["Prezzo", "Notifica", "Timer", "Timer Aggiornamento [s]", "Data Inserimento", "Data Ultima Modifica"] else "w", 
+                             stretch=False)
+
+    scrollbar_vertical = ttk.Scrollbar(frame_products_list, orient="vertical", command=scroll_products_tree)
+    scrollbar_vertical.grid(row=0, column=1, sticky="ns")
+
+    scrollbar_horizontal = ttk.Scrollbar(frame_products_list, orient="horizontal", command=products_tree.xview)
+    scrollbar_horizontal.grid(row=1, column=0, sticky="ew")
+
+    frame_products_list.grid_rowconfigure(0, weight=1)
+    frame_products_list.grid_columnconfigure(0, weight=1)
+
+    products_tree.configure(yscrollcommand=on_products_tree_yscroll, xscrollcommand=scrollbar_horizontal.set)
+    products_tree.tag_configure("hover", background="#cceeff")
+
+    # Footer
+    frame_footer = ttk.Frame(root)
+    frame_footer.pack(side="bottom", fill="x", padx=(20, 40), pady=2)
+
+    creator_label = tk.Label(frame_footer, text="Prodotto da Vincenzo Salvati", font=("Arial", 8))
+    creator_label.pack(side="right")
+
+    # Menu tasto destro
+    single_selection_menu = tk.Menu(root, tearoff=0)
+    single_selection_menu.add_command(label="Visualizza prodotto", command=show_product_details)
+    single_selection_menu.add_command(label="Modifica prodotto", command=open_edit_product_dialog)
+    single_selection_menu.add_command(label="Rimuovi prodotto", command=remove_products)
+    single_selection_menu.add_command(label="Aggiorna selezionato", command=lambda: open_progress_dialog(update_all_prices=False))
+
+    multi_selection_menu = tk.Menu(root, tearoff=0)
+    multi_selection_menu.add_command(label="Rimuovi selezionati", command=remove_products)
+    multi_selection_menu.add_command(label="Aggiorna selezionati", command=lambda: open_progress_dialog(update_all_prices=False))
+
+    no_selection_menu = tk.Menu(root, tearoff=0)
+    no_selection_menu.add_command(label="Nuovo", command=open_add_product_dialog)
+
+    # Definizione eventi root e product_tree
+    root.bind("<Control-a>", select_all_products)
+    root.bind("<Configure>", update_tree_view_columns_width)
+    root.bind("<Button-1>", click)
+    root.bind("<Shift-Button-1>", shift_click)
+    root.bind("<Down>", arrow_navigation_and_shift_arrow)
+    root.bind("<Up>", arrow_navigation_and_shift_arrow)
+
+    search_entry.bind("<Button-3>", lambda e: show_text_menu(e, search_entry))
+
+    products_tree.bind("<Double-1>", double_click)
+    products_tree.bind("<Return>", show_product_details)
+    products_tree.bind("<Button-3>", show_tree_view_menu)
+    products_tree.bind("<Motion>", on_hover_products_tree)
+    products_tree.bind("<MouseWheel>", on_products_tree_mouse_wheel)
 
-# Menu tasto destro
-single_selection_menu = tk.Menu(root, tearoff=0)
-single_selection_menu.add_command(label="Visualizza prodotto", command=show_product_details)
-single_selection_menu.add_command(label="Modifica prodotto", command=open_edit_product_dialog)
-single_selection_menu.add_command(label="Rimuovi prodotto", command=remove_products)
-single_selection_menu.add_command(label="Aggiorna selezionato", command=lambda: open_progress_dialog(update_all_prices=False))
+    # Archivio SQLite opzionale: python AmazonTracker.py --sqlite (al primo avvio vengono importati i dati dei file JSON)
+    if "--sqlite" in sys.argv or os.path.exists(database_file):
+        storage_backend = "sqlite"
+        migrate_json_to_sqlite()
 
-multi_selection_menu = tk.Menu(root, tearoff=0)
-multi_selection_menu.add_command(label="Rimuovi selezionati", command=remove_products)
-multi_selection_menu.add_command(label="Aggiorna selezionati", command=lambda: open_progress_dialog(update_all_prices=False))
+    # Carica i dati: lo storico e le statistiche dei prezzi prima dei prodotti, perché il primo intervallo adattivo
+    # calcolato all'avvio del monitoraggio dipende dai prezzi recenti
+    load_prices()
+    load_products()
+    load_emails()
+
+    check_and_save_new_emails()
 
-no_selection_menu = tk.Menu(root, tearoff=0)
-no_selection_menu.add_command(label="Nuovo", command=open_add_product_dialog)
-
-# Definizione eventi root e product_tree
-root.bind("<Control-a>", select_all_products)
-root.bind("<Configure>", update_tree_view_columns_width)
-root.bind("<Button-1>", click)
-root.bind("<Shift-Button-1>", shift_click)
-root.bind("<Down>", arrow_navigation_and_shift_arrow)
-root.bind("<Up>", arrow_navigation_and_shift_arrow)
-
-search_entry.bind("<Button-3>", lambda e: show_text_menu(e, search_entry))
+    # Verifica della configurazione delle notifiche all'avvio, invece che al primo invio
+    try:
+        load_config()
+    except Exception as e:
+        logger.error(f"Errore nel caricamento del file di configurazione: {e}")
+        messagebox.showwarning("Attenzione", f"Errore nel caricamento del file di configurazione, le notifiche non verranno inviate finché non sarà corretto:\n{e}")
 
-products_tree.bind("<Double-1>", double_click)
-products_tree.bind("<Return>", show_product_details)
-products_tree.bind("<Button-3>", show_tree_view_menu)
-products_tree.bind("<Motion>", on_hover_products_tree)
+    # Avvio interfaccia
+    root.after(150, update_tree_view_columns_width)
+    periodic_refresh_root()
+    root.mainloop()
 
-# Carica i dati
-load_products()
-load_prices()
-load_emails()
+    # Salvataggio dei dati ancora in attesa dello scrittore in background e dei prezzi in attesa di commit
+    flush_persistence()
 
-check_and_save_new_emails()
+    # Invio del riepilogo in corso, consegna delle notifiche ancora in coda e chiusura delle connessioni SMTP rimaste nel pool
+    flush_notification_digest()
+    shutdown_notification_queue(notification_shutdown_timeout)
+    close_smtp_sessions()
 
-# Avvio interfaccia
-root.after(150, update_tree_view_columns_width)
-periodic_refresh_root()
-root.mainloop()
+    if storage_backend == "sqlite":
+        flush_database_prices()
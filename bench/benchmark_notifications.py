@@ -0,0 +1,116 @@
+"""
+Benchmark dei modelli precompilati delle notifiche rispetto alla composizione dei testi per concatenazione
+usata in precedenza, con la verifica che i messaggi generati siano identici
+
+Uso: python bench/benchmark_notifications.py [ripetizioni]
+"""
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from AmazonTracker import render_notification_messages
+
+
+def render_notification_messages_concatenation(name, url, previous_price, current_price, average_price, price_minimum, price_maximum, text_suggestion, has_image, emails_and_thresholds):
+    """
+    Composizione di riferimento, per concatenazione di f-string ad ogni notifica e ad ogni destinatario
+    """
+    telegram_text = default_body_email = None
+    emails_to_send = []
+
+    if average_price == price_minimum == price_maximum:
+        body = (
+            f"Il prezzo dell'articolo '{name}' è sceso da {previous_price}€ a {current_price}€.\n\n"
+            + "Dettagli:\n\t- Primo ribasso del prezzo rilevato\n\nNon ho abbastanza dati nello storico del prodotto per fornire un suggerimento sulla validità dell'acquisto\n\n"
+            + f"Acquista ora: {url}"
+        )
+        body_email = (
+                f"Il prezzo dell'articolo '{name}' è sceso da {previous_price}€ a {current_price}€.<br><br>"
+                + "Dettagli:<br>\t- Primo ribasso del prezzo rilevato<br><br>"
+                + "Non ho abbastanza dati nello storico del prodotto per fornire un suggerimento sulla validità dell'acquisto.<br><br>"
+                + f"Acquista ora: <a href='{url}'>clicca qui</a><br><br>"
+        )
+    else:
+        body = (
+            f"Il prezzo dell'articolo '{name}' è sceso da {previous_price}€ a {current_price}€.\n\n"
+            + f"Dettagli:\n\t- Prezzo medio: {average_price}€\n\t- Prezzo minimo storico: {price_minimum}€\n\t- Prezzo massimo storico: {price_maximum}€\n\n{text_suggestion}\n\n"
+            + f"Acquista ora: {url}"
+            )
+        body_email = (
+                f"Il prezzo dell'articolo '{name}' è sceso da {previous_price}€ a {current_price}€.<br><br>"
+                + f"Dettagli:<br>\t- Prezzo medio: {average_price}€<br>\t- Prezzo minimo storico: {price_minimum}€<br>\t- Prezzo massimo storico: {price_maximum}€<br><br>"
+                + f"{text_suggestion}<br><br>"
+                + f"Acquista ora: <a href='{url}'>clicca qui</a><br><br>"
+        )
+
+    if has_image:
+        body_email += f"<img src='cid:image1'>"
+
+    if current_price < previous_price:
+        telegram_text, default_body_email = body, body_email
+
+    for email, threshold in emails_and_thresholds.items():
+        value_to_compare = previous_price
+        subject_to_send = "Prezzo in calo!"
+        body_to_send = body_email
+
+        if threshold != 0.0:
+            value_to_compare = threshold
+            subject_to_send = "Prezzo inferiore alla soglia indicata!"
+            body_to_send = (
+                        f"Il prezzo dell'articolo '{name}' è al di sotto della soglia di {value_to_compare}€ indicata.<br>"
+                        + f"Il costo attuale è {current_price}€.<br><br>"
+                        + f"Dettagli:<br>\t- Prezzo medio: {average_price}€<br>\t- Prezzo minimo storico: {price_minimum}€<br>\t- Prezzo massimo storico: {price_maximum}€<br><br>"
+                        + f"{text_suggestion}<br><br>"
+                        + f"Acquista ora: <a href='{url}'>clicca qui</a><br><br>"
+            )
+
+            if has_image:
+                body_to_send += f"<img src='cid:image1'>"
+
+        if current_price < value_to_compare:
+            emails_to_send.append((email, subject_to_send, body_to_send))
+
+    return telegram_text, default_body_email, emails_to_send
+
+
+def main(repeat):
+    """
+    Verifica i messaggi e confronta i tempi delle due composizioni; restituisce 1 se i messaggi differiscono
+    """
+    emails_and_thresholds = {f"utente{index}@example.com": (0.0 if index % 2 else 150.0 + index % 3) for index in range(10)}
+
+    # Casi di prova: primo ribasso, ribasso con storico, soglia superata senza ribasso, con e senza immagine
+    samples = {
+        "primo ribasso": ("Prodotto {prova}", "https://www.amazon.it/dp/B000000001", 199.99, 149.5, 149.5, 149.5, 149.5, "", True, emails_and_thresholds),
+        "ribasso con storico": ("Prodotto di prova", "https://www.amazon.it/dp/B000000002", 199.99, 149.5, 180.25, 149.5, 219.0, "Buon momento per acquistare", True, emails_and_thresholds),
+        "solo soglie": ("Prodotto di prova", "https://www.amazon.it/dp/B000000003", 120.0, 121.0, 130.0, 99.0, 150.0, "Prezzo nella media", False, emails_and_thresholds)
+    }
+
+    exit_code = 0
+
+    for sample_name, sample in samples.items():
+        identical = render_notification_messages(*sample) == render_notification_messages_concatenation(*sample)
+
+        if not identical:
+            exit_code = 1
+
+        print(f"{sample_name} ({len(sample[-1])} destinatari){'' if identical else '    ATTENZIONE: messaggi diversi'}")
+
+        for render in (render_notification_messages_concatenation, render_notification_messages):
+            start = time.perf_counter()
+
+            for _ in range(repeat):
+                render(*sample)
+
+            elapsed_us = (time.perf_counter() - start) / repeat * 1000000
+
+            print(f"    {render.__name__:<45} {elapsed_us:>10.2f} µs")
+
+    return exit_code
+
+
+if __name__ == "__main__":
+    sys.exit(main(int(sys.argv[1]) if len(sys.argv) > 1 else 20000))
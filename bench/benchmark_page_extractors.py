@@ -0,0 +1,72 @@
+"""
+Benchmark degli estrattori di `page_extractors` sulle pagine prodotto Amazon salvate in una cartella, con tempo di analisi
+e memoria di picco per ogni pagina e la verifica che ogni estrattore trovi lo stesso prezzo dell'analisi con BeautifulSoup
+
+Uso: python bench/benchmark_page_extractors.py <cartella con le pagine .html> [ripetizioni]
+"""
+import os
+import sys
+import time
+import tracemalloc
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from AmazonTracker import page_extractors, extract_product_page_soup
+
+
+def main(samples_dir, repeat):
+    """
+    Confronta tempi e memoria degli estrattori; restituisce 1 se un estrattore trova un prezzo diverso da quello di riferimento
+    """
+    sample_files = sorted(file_name for file_name in os.listdir(samples_dir) if file_name.endswith((".html", ".htm")))
+
+    if not sample_files:
+        print(f"Nessuna pagina .html trovata in '{samples_dir}'")
+        return 1
+
+    exit_code = 0
+
+    for file_name in sample_files:
+        with open(os.path.join(samples_dir, file_name), "rb") as file:
+            content = file.read()
+
+        # Il prezzo di riferimento è quello dell'analisi completa con BeautifulSoup
+        reference_price = extract_product_page_soup(content)["price"]
+
+        print(f"{file_name} ({len(content) // 1024} KB, prezzo di riferimento {reference_price})")
+
+        for extractor in page_extractors:
+            # Tempo medio di analisi
+            start = time.perf_counter()
+
+            for _ in range(repeat):
+                page = extractor(content)
+
+            elapsed_ms = (time.perf_counter() - start) / repeat * 1000
+
+            # Memoria di picco durante una singola analisi
+            tracemalloc.start()
+            extractor(content)
+            _, peak_memory = tracemalloc.get_traced_memory()
+            tracemalloc.stop()
+
+            # Un estrattore veloce che non trova gli elementi lascia la pagina al successivo e non è un errore
+            if page is None:
+                result = "elementi non trovati"
+            elif page["price"] != reference_price:
+                result = f"prezzo {page['price']}    ATTENZIONE: prezzo diverso"
+                exit_code = 1
+            else:
+                result = f"prezzo {page['price']}"
+
+            print(f"    {extractor.__name__:<30} {elapsed_ms:>10.2f} ms {peak_memory / 1024:>12.0f} KB    {result}")
+
+    return exit_code
+
+
+if __name__ == "__main__":
+    if len(sys.argv) < 2:
+        print(__doc__.strip().splitlines()[-1])
+        sys.exit(2)
+
+    sys.exit(main(sys.argv[1], int(sys.argv[2]) if len(sys.argv) > 2 else 5))
@@ -0,0 +1,121 @@
+"""
+Prova del pool di connessioni SMTP contro un server SMTP locale (aiosmtpd), senza TLS né autenticazione:
+confronta il tempo di invio con e senza riutilizzo delle connessioni e verifica la chiusura delle connessioni inattive
+
+Richiede aiosmtpd (pip install aiosmtpd)
+Uso: python bench/benchmark_smtp_pool.py [messaggi]
+"""
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from aiosmtpd.controller import Controller
+
+import AmazonTracker
+
+
+class CountingHandler:
+    """
+    Gestore del server SMTP locale che conta i messaggi ricevuti
+    """
+    def __init__(self):
+        self.messages = 0
+
+    async def handle_DATA(self, server, session, envelope):
+        self.messages += 1
+
+        return "250 OK"
+
+
+def send_messages(config, count):
+    """
+    Invia `count` messaggi tramite il pool e restituisce il tempo impiegato e le connessioni aperte
+    """
+    opened_sessions = 0
+    open_smtp_session = AmazonTracker.open_smtp_session
+
+    def counting_open_smtp_session(config):
+        nonlocal opened_sessions
+
+        opened_sessions += 1
+
+        return open_smtp_session(config)
+
+    AmazonTracker.open_smtp_session = counting_open_smtp_session
+
+    try:
+        start = time.perf_counter()
+
+        for index in range(count):
+            AmazonTracker.send_smtp_message(config, "mittente@example.com", "destinatario@example.com", f"Subject: Prova {index}\r\n\r\nMessaggio di prova")
+
+        return time.perf_counter() - start, opened_sessions
+    finally:
+        AmazonTracker.open_smtp_session = open_smtp_session
+
+
+def main(count):
+    """
+    Esegue la prova; restituisce 1 se un controllo non riesce
+    """
+    handler = CountingHandler()
+    controller = Controller(handler, hostname="127.0.0.1", port=8025)
+    controller.start()
+
+    exit_code = 0
+
+    try:
+        config = {"sender_email": "mittente@example.com", "sender_password": "", "smtp_host": "127.0.0.1", "smtp_port": controller.port,
+                  "smtp_starttls": False, "smtp_login": False}
+
+        # Senza pool: ogni connessione viene chiusa dopo l'invio
+        smtp_pool_max_idle = AmazonTracker.smtp_pool_max_idle
+        AmazonTracker.smtp_pool_max_idle = 0
+
+        try:
+            elapsed, opened_sessions = send_messages(config, count)
+        finally:
+            AmazonTracker.smtp_pool_max_idle = smtp_pool_max_idle
+
+        print(f"    {'senza pool':<20} {elapsed / count * 1000:>10.2f} ms/messaggio {opened_sessions:>6} connessioni")
+
+        # Con pool: la stessa connessione viene riutilizzata
+        elapsed, opened_sessions = send_messages(config, count)
+
+        print(f"    {'con pool':<20} {elapsed / count * 1000:>10.2f} ms/messaggio {opened_sessions:>6} connessioni")
+
+        if opened_sessions != 1:
+            print(f"ATTENZIONE: attesa una sola connessione con il pool, aperte {opened_sessions}")
+            exit_code = 1
+
+        if handler.messages != 2 * count:
+            print(f"ATTENZIONE: ricevuti {handler.messages} messaggi su {2 * count}")
+            exit_code = 1
+
+        # Chiusura delle connessioni inattive senza nuovi invii
+        smtp_idle_timeout = AmazonTracker.smtp_idle_timeout
+        AmazonTracker.smtp_idle_timeout = 0.5
+
+        try:
+            AmazonTracker.close_smtp_sessions()
+            send_messages(config, 1)
+            time.sleep(1)
+        finally:
+            AmazonTracker.smtp_idle_timeout = smtp_idle_timeout
+
+        if AmazonTracker.smtp_pool:
+            print("ATTENZIONE: connessioni inattive ancora aperte nel pool")
+            exit_code = 1
+        else:
+            print("    connessioni inattive chiuse senza nuovi invii")
+    finally:
+        AmazonTracker.close_smtp_sessions()
+        controller.stop()
+
+    return exit_code
+
+
+if __name__ == "__main__":
+    sys.exit(main(int(sys.argv[1]) if len(sys.argv) > 1 else 200))